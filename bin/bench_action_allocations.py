@@ -0,0 +1,159 @@
+"""
+Benchmark for the number of objects allocated per API request, comparing the
+old per-request device/action construction with the device registry and
+class-level action index.
+
+Usage (from the repo root): python bin/bench_action_allocations.py
+"""
+import os, sys
+import tracemalloc
+
+from collections import Counter
+
+sys.path.append(os.getcwd())
+
+# Running without Reelgood credentials, so no network calls are made
+os.environ.pop('SHH_RG_EMAIL', None)
+os.environ.pop('SHH_RG_PASS', None)
+
+from marshmallow import fields
+
+from smart_home_hub.api.device_resource import device_resp_obj
+from smart_home_hub.api.utils import argmap_resp_obj
+from smart_home_hub.device import device_class_map, device_registry
+from smart_home_hub.device.base_device import DeviceAction
+
+DEVICE_NAME = 'roku'
+ACTION_NAME = 'volume'
+NUM_REQUESTS = 100
+
+counts = Counter()
+
+
+def count_inits(cls, key):
+    """
+    Patches cls.__init__ to count every instance constructed
+    """
+    orig_init = cls.__init__
+
+    def counted_init(self, *args, **kwargs):
+        counts[key] += 1
+        orig_init(self, *args, **kwargs)
+
+    cls.__init__ = counted_init
+
+
+def legacy_actions(d):
+    """
+    Device.actions() as it was before the action index: a new instance of
+    every available action, on every call
+    """
+    return [
+        action_cls(d) for action_cls in type(d)._action_classes
+        if action_cls.is_available(d)
+    ]
+
+
+def legacy_action_map(d):
+    """
+    Device.action_map() as it was before the action index, built from another
+    call to actions()
+    """
+    action_map = {}
+
+    for action in legacy_actions(d):
+        if action.name in action_map:
+            raise ValueError(f'Non-unique name {action.name} for Action')
+
+        action_map[action.name] = action
+
+    return action_map
+
+
+def legacy_devices_request():
+    """
+    GET /devices, as it was served before the registry & action index
+    """
+    def resp_obj(a):
+        return {
+            'name': a.name,
+            'description': a.description,
+            'argmap': argmap_resp_obj(a.argmap())
+        }
+
+    d = device_class_map[DEVICE_NAME]()
+    return {
+        'name': d.name,
+        'description': d.description,
+        'actions': [resp_obj(a) for a in legacy_actions(d)],
+        'action_map': {
+            a_name: resp_obj(a) for a_name, a in legacy_action_map(d).items()
+        }
+    }
+
+
+def legacy_action_request():
+    """
+    POST /devices/<device>/<action>, up to the point of parsing the args
+    """
+    d = device_class_map[DEVICE_NAME](context=None)
+    a = legacy_action_map(d)[ACTION_NAME]
+    return a, a.argmap()
+
+
+def devices_request():
+    return device_resp_obj(device_registry.view(DEVICE_NAME))
+
+
+def action_request():
+    d = device_registry.view(DEVICE_NAME, context=None)
+    spec = d.action_spec(ACTION_NAME)
+    return d.action(ACTION_NAME), spec.schema
+
+
+def measure(label, request_func):
+    """
+    Runs the request NUM_REQUESTS times, printing the objects allocated per
+    request
+    """
+    counts.clear()
+    tracemalloc.start()
+    snapshot_before = tracemalloc.take_snapshot()
+
+    for _ in range(NUM_REQUESTS):
+        request_func()
+
+    snapshot_after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    blocks = sum(
+        stat.count_diff
+        for stat in snapshot_after.compare_to(snapshot_before, 'filename')
+        if stat.count_diff > 0
+    )
+
+    print(
+        f'{label:<28}'
+        f'actions/req: {counts["actions"] / NUM_REQUESTS:>6.1f}  '
+        f'fields/req: {counts["fields"] / NUM_REQUESTS:>6.1f}  '
+        f'retained blocks: {blocks:>6}'
+    )
+
+
+def main():
+    count_inits(DeviceAction, 'actions')
+    count_inits(fields.Field, 'fields')
+
+    # Warming the registry, as the hub does at startup
+    device_registry.start()
+
+    measure('before: GET /devices', legacy_devices_request)
+    measure('after:  GET /devices', devices_request)
+    measure('before: POST action', legacy_action_request)
+    measure('after:  POST action', action_request)
+
+    device_registry.shutdown()
+
+
+if __name__ == '__main__':
+    main()
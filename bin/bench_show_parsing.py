@@ -0,0 +1,127 @@
+"""
+Benchmark for picking the episode to play from a large Reelgood show payload,
+comparing loading the whole payload (resp.json()) with the streaming,
+field-selective parser.
+
+Usage (from the repo root): python bin/bench_show_parsing.py [payload.json]
+Without a recorded payload, a synthetic show with NUM_EPISODES episodes is used.
+"""
+import json
+import os, sys
+import time
+import tracemalloc
+
+sys.path.append(os.getcwd())
+
+from smart_home_hub.device.devices.roku.reelgood_client import RGClient
+from smart_home_hub.device.devices.roku.reelgood_stream import parse_show_episode
+
+NUM_EPISODES = 3000
+SERVICES = ['netflix', 'hulu_plus', 'amazon_prime', 'hbo_max', 'disney_plus']
+CHUNK_SIZE = 64 * 1024
+NUM_RUNS = 5
+
+
+def synthetic_payload(num_episodes=NUM_EPISODES) -> bytes:
+    """
+    Returns a show payload shaped like /content/show/<id>, with the episodes
+    before the recommended episode (the worst case for the streaming parser)
+    """
+    episodes = {}
+    for ndx in range(num_episodes):
+        ep_id = f'{ndx:08x}-0000-0000-0000-000000000000'
+        episodes[ep_id] = {
+            'id': ep_id,
+            'title': f'Episode {ndx}',
+            'overview': 'An episode of a long running show. ' * 8,
+            'sequence_number': ndx + 1,
+            'season_number': ndx // 24 + 1,
+            'number': ndx % 24 + 1,
+            'aired_at': '2010-01-01T00:00:00',
+            'availability': [
+                {
+                    'source_name': service,
+                    'access_type': 2,
+                    'source_data': {
+                        'links': {'web': f'https://example.com/{service}/{ndx}'},
+                        'references': {'web': {'episode_id': str(ndx)}}
+                    }
+                }
+                for service in SERVICES
+            ]
+        }
+
+    return json.dumps({
+        'id': 'show',
+        'title': 'A Long Running Show',
+        'episodes': episodes,
+        'recommended_episode': {'episode_id': list(episodes)[num_episodes // 2]}
+    }).encode('utf-8')
+
+
+def pick_full(payload: bytes) -> dict:
+    """
+    The old approach: load everything, then pick the episode and build its
+    streaming ID map
+    """
+    info = json.loads(payload)
+
+    if info.get('recommended_episode'):
+        recommended_id = info['recommended_episode']['episode_id']
+    else:
+        recommended_id = min(
+            info['episodes'].values(), key=lambda ep: ep['sequence_number']
+        )['id']
+
+    return RGClient._get_streaming_id_map('episode', info['episodes'][recommended_id])
+
+
+def pick_streaming(payload: bytes) -> dict:
+    """
+    The streaming approach, as used by RGClient.get_show_viewing_id
+    """
+    chunks = (
+        payload[ndx:ndx + CHUNK_SIZE] for ndx in range(0, len(payload), CHUNK_SIZE)
+    )
+
+    return parse_show_episode(
+        chunks,
+        lambda episode: RGClient._get_streaming_id_map('episode', episode)
+    )
+
+
+def measure(pick, payload):
+    """
+    Returns the best time (in ms) and the peak memory (in MB) of pick
+    """
+    times = []
+    for _ in range(NUM_RUNS):
+        start = time.perf_counter()
+        pick(payload)
+        times.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    pick(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(times), peak / 1024 / 1024
+
+
+def main():
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'rb') as payload_file:
+            payload = payload_file.read()
+    else:
+        payload = synthetic_payload()
+
+    assert pick_full(payload) == pick_streaming(payload)
+
+    print(f'Payload: {len(payload) / 1024 / 1024:.1f} MB')
+    for name, pick in [('json.loads', pick_full), ('streaming', pick_streaming)]:
+        best_ms, peak_mb = measure(pick, payload)
+        print(f'{name:>12}: {best_ms:8.1f} ms, peak {peak_mb:6.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Imports the Roku content maps (content_id_map.json and
+random_episode_ranges.json) from the config dir into the SQLite content store,
+replacing its current contents. Used with SHH_ROKU_CONTENT_STORE=sqlite.
+
+Usage (from the repo root): python bin/import_content_store.py
+"""
+import os, sys
+import time
+
+from dotenv import load_dotenv, find_dotenv
+
+sys.path.append(os.getcwd())
+
+
+def main():
+    load_dotenv(find_dotenv(raise_error_if_not_found=True, usecwd=True))
+
+    # Imported after loading the .env, since it sets CONFIG_BASE_DIR
+    from smart_home_hub.device.devices.roku.content_index import (
+        CONTENT_ID_MAP_PATH, EPISODE_RANGES_PATH
+    )
+    from smart_home_hub.device.devices.roku.content_store import ContentStore
+    from smart_home_hub.utils.config import load_config
+
+    start = time.perf_counter()
+
+    content_id_map = dict(load_config(CONTENT_ID_MAP_PATH))
+    ep_ranges_map = dict(load_config(EPISODE_RANGES_PATH))
+
+    store = ContentStore()
+    store.import_maps(content_id_map, ep_ranges_map)
+    store.close()
+
+    print(
+        f'Imported {sum(len(m) for m in content_id_map.values())} content IDs and '
+        f'{sum(len(m) for m in ep_ranges_map.values())} shows into {store.filepath} '
+        f'in {time.perf_counter() - start:.2f}s'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -32,6 +32,18 @@ ENV_VAR_INFO = [
         'default': 'none',
         'additional_info_func': list_audio_devices
     },
+    {
+        'name': 'SHH_ROKU_SKIP_REDUNDANT',
+        'desc': 'Whether to skip Roku commands that would not change anything '
+                '(ex: turning on a Roku that is already on)',
+        'default': 'false'
+    },
+    {
+        'name': 'SHH_ROKU_CONTENT_STORE',
+        'desc': 'Backend for the Roku content maps, "json" or "sqlite" (for '
+                'large catalogs, imported with bin/import_content_store.py)',
+        'default': 'json'
+    },
     {
         'name': 'SHH_RG_EMAIL',
         'desc': 'A Reelgood email to use if using the account functionality'
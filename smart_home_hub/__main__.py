@@ -5,17 +5,21 @@ import threading
 import time
 
 from dotenv import load_dotenv, find_dotenv
-from queue import Queue
 
 sys.path.append(os.getcwd())
 
-# TODO: 2 different contexts, or should we have a lock over the context?
-
 # Loading environment variables before imports (in case any are env dependent)
 load_dotenv(find_dotenv(raise_error_if_not_found=True, usecwd=True))
 
 from smart_home_hub.api.api import app
-from smart_home_hub.utils.env_consts import API_PORT
+from smart_home_hub.api.catalog import device_catalog
+from smart_home_hub.device import action_executor, device_registry
+from smart_home_hub.utils.env_consts import API_PORT, check_env
+
+try:
+    check_env()
+except ValueError as e:
+    sys.exit(str(e))
 
 
 api_thread = threading.Thread(
@@ -24,7 +28,8 @@ api_thread = threading.Thread(
         'host': '0.0.0.0',
         'port': API_PORT,
         'debug': False,
-        'threaded': False
+        # Threaded so clients waiting on slow actions/jobs don't block others
+        'threaded': True
     },
     daemon=True
 )
@@ -32,18 +37,9 @@ vui_thread = threading.Thread(
     target=lambda x: None
 )
 
-# Methods to use
-q = Queue()
-
-task = 0
-q.put(task)
-
-q.get()
-q.task_done()
-
-q.join()
-
-# Continue actual stuff
+# Building every device up front, so the first request doesn't pay for it
+device_registry.start()
+device_catalog.compile()
 
 api_thread.run()
 vui_thread.run()
@@ -62,3 +58,8 @@ requests.post(
 
 api_thread.join()
 vui_thread.join()
+
+# NOTE: The API & VUI threads submit every action to action_executor, which
+#       runs one action at a time per device
+action_executor.shutdown(wait=False)
+device_registry.shutdown()
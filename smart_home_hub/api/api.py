@@ -2,15 +2,21 @@ import json
 import os
 import sys
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from werkzeug.exceptions import HTTPException
 from webargs.flaskparser import parser
 
 sys.path.append(os.getcwd())
 
 from smart_home_hub.api.utils import APIInvalidError, get_context
-from smart_home_hub.api.device_resource import device_resp_obj, action_resp_obj
-from smart_home_hub.device import device_class_map
+from smart_home_hub.api.batch import BATCH_SCHEMA, run_batch, validate_batch
+from smart_home_hub.api.catalog import device_catalog
+from smart_home_hub.api.jobs import job_manager
+from smart_home_hub.device import action_executor, device_registry
+from smart_home_hub.device.devices.roku.reelgood_cache import rg_response_cache
+from smart_home_hub.device.devices.roku.reelgood_client import rg_flights, rg_transport
+from smart_home_hub.device.executor import ExecutorFullError
+from smart_home_hub.utils.env_consts import check_env
 
 app = Flask(__name__)
 
@@ -22,6 +28,40 @@ def error_handler(error):
     return response
 
 
+@app.errorhandler(ExecutorFullError)
+def executor_full_handler(error):
+    return error_handler(APIInvalidError(503, str(error)))
+
+
+def async_requested() -> bool:
+    """
+    Returns whether the client asked for the action to run as a background
+    job, either with ?async=true or a 'Prefer: respond-async' header
+    """
+    if request.args.get('async', '').lower() in ['1', 'true', 'yes']:
+        return True
+
+    return 'respond-async' in request.headers.get('Prefer', '')
+
+
+def catalog_response(*key):
+    """
+    Responds with the precompiled catalog entry for the given key, or a 304
+    if the client's ETag shows it already has the current version
+    """
+    try:
+        entry = device_catalog.entry(*key)
+    except KeyError:
+        if len(key) > 1 and (key[0],) in device_catalog.snapshot().entries:
+            raise APIInvalidError(404, 'No action found')
+        raise APIInvalidError(404, 'No device found')
+
+    response = Response(entry.body, status=200, mimetype='application/json')
+    response.set_etag(entry.etag)
+
+    return response.make_conditional(request)
+
+
 @app.route('/devices', methods=['GET'])
 def devices():
     """
@@ -30,10 +70,7 @@ def devices():
     """
     # TODO: Maybe include context here (could have context applicable to
     #       multiple devices)
-    return jsonify([
-        device_resp_obj(device_cls())
-        for device_cls in device_class_map.values()
-    ]), 200
+    return catalog_response()
 
 
 @app.route('/devices/<device_name>', methods=['GET'])
@@ -42,15 +79,55 @@ def device(device_name):
     Responds with the device info and actions for a specific device
     (includes context)
     """
-    try:
-        device_cls = device_class_map[device_name]
-    except KeyError:
-        raise APIInvalidError(404)
+    # NOTE: The device & action info does not depend on the context yet, so
+    #       the precompiled catalog is used
+    return catalog_response(device_name)
 
-    context = get_context()
-    d = device_cls(context=context)
 
-    return jsonify(device_resp_obj(d)), 200
+@app.route('/devices/<device_name>/batch', methods=['POST'])
+def device_batch(device_name):
+    """
+    Executes an ordered list of actions for one device, responding with the
+    result of each. All items are validated before any are performed.
+    """
+    if device_name not in device_registry.names():
+        raise APIInvalidError(404, 'No device found')
+
+    return batch_response(device_name)
+
+
+@app.route('/batch', methods=['POST'])
+def batch():
+    """
+    Executes an ordered list of actions across any devices (each item must
+    specify its "device"), responding with the result of each
+    """
+    return batch_response()
+
+
+def batch_response(device_name=None):
+    """
+    Helper method to parse, validate and run the batch in the request body
+    """
+    args = parser.parse(
+        argmap=BATCH_SCHEMA,
+        location='json',
+        error_status_code=400
+    )
+
+    items = validate_batch(
+        args['items'],
+        device_name=device_name,
+        context=get_context()
+    )
+
+    return jsonify({
+        'responses': run_batch(
+            items,
+            parallel=args['parallel'],
+            stop_on_error=args['stop_on_error']
+        )
+    }), 200
 
 
 @app.route('/devices/<device_name>/<action_name>', methods=['GET', 'POST'])
@@ -58,31 +135,78 @@ def action(device_name, action_name):
     """
     Either executes the action with the given arguments (POST), or
     Retrieves the action and its arg map based on the context
+
+    If async is requested for a POST, responds immediately with a 202 and the
+    job to poll at /jobs/<job_id>
     """
+    if request.method == 'GET':
+        return catalog_response(device_name, action_name)
+
+    context = get_context()
+
     try:
-        device_cls = device_class_map[device_name]
+        d = device_registry.view(device_name, context=context)
     except KeyError:
         raise APIInvalidError(404, 'No device found')
 
-    context = get_context()
-    d = device_cls(context=context)
-
     try:
-        a = d.action_map()[action_name]
+        spec = d.action_spec(action_name)
     except KeyError:
         raise APIInvalidError(404, 'No action found')
 
-    if request.method == 'GET':
-        return jsonify(action_resp_obj(a)), 200
-    else:
-        a.init_args(**parser.parse(
-            argmap=a.argmap(),
-            location='json',
-            error_status_code=400
-        ))
-        a.perform()
+    a = d.action(action_name)
+    a.init_args(**parser.parse(
+        argmap=spec.schema,
+        location='json',
+        error_status_code=400
+    ))
+
+    if async_requested():
+        job = job_manager.submit(device_name, a)
+        response = jsonify(job.to_dict())
+        response.status_code = 202
+        response.headers['Location'] = f'/jobs/{job.id}'
+        return response
 
-        return jsonify(a.response()), 200
+    return jsonify(action_executor.perform(a)), 200
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job(job_id):
+    """
+    Responds with the status of a background job (and the action's response
+    once it is done). Pass ?wait=<seconds> to block until the job finishes or
+    the timeout passes.
+    """
+    try:
+        wait = request.args.get('wait', type=float)
+        j = job_manager.get(job_id, wait=wait)
+    except KeyError:
+        raise APIInvalidError(404, 'No job found')
+
+    return jsonify(j.to_dict()), 200
+
+
+@app.route('/metrics/executor', methods=['GET'])
+def executor_metrics():
+    """
+    Responds with the queue metrics of each device's action queue
+    """
+    return jsonify(action_executor.metrics()), 200
+
+
+@app.route('/metrics/reelgood', methods=['GET'])
+def reelgood_metrics():
+    """
+    Responds with the hit/miss counters of the Reelgood response cache, the
+    request/connection counters of the Reelgood transport, and how many
+    lookups shared an identical in-flight request
+    """
+    return jsonify({
+        'cache': rg_response_cache.metrics(),
+        'transport': rg_transport.metrics(),
+        'flights': rg_flights.metrics()
+    }), 200
 
 
 @app.route('/shutdown', methods=['POST'])
@@ -128,4 +252,9 @@ def handle_exception(e):
 
 
 if __name__ == '__main__':
+    try:
+        check_env()
+    except ValueError as e:
+        sys.exit(str(e))
+
     app.run()
@@ -0,0 +1,170 @@
+"""
+This file contains helpers to validate and run a batch of device actions given
+in one request.
+"""
+from concurrent.futures import Future
+from marshmallow import EXCLUDE, Schema, ValidationError, fields
+from typing import List, Optional
+
+from smart_home_hub.device import action_executor, device_registry
+from smart_home_hub.device.base_device import DeviceAction
+from .utils import APIInvalidError
+
+MAX_BATCH_SIZE = 50
+
+# Argmap for the body of a batch request
+BATCH_ARGMAP = {
+    'items': fields.List(
+        fields.Dict(),
+        required=True,
+        description='Ordered list of {"device", "action", "args"} items'
+    ),
+    'parallel': fields.Bool(
+        missing=False,
+        description='Whether to run the items for different devices '
+                    'concurrently (items for the same device stay in order)'
+    ),
+    'stop_on_error': fields.Bool(
+        missing=True,
+        description='Whether to skip the remaining (sequential) items once '
+                    'one fails'
+    )
+}
+BATCH_SCHEMA = Schema.from_dict(BATCH_ARGMAP, name='BatchSchema')()
+
+# Shape of each item of a batch (its args are validated by the action's schema)
+BATCH_ITEM_ARGMAP = {
+    'device': fields.Str(missing=None, allow_none=True),
+    'action': fields.Str(required=True),
+    'args': fields.Dict(missing=None, allow_none=True)
+}
+BATCH_ITEM_SCHEMA = Schema.from_dict(
+    BATCH_ITEM_ARGMAP, name='BatchItemSchema'
+)(unknown=EXCLUDE)
+
+
+class BatchItem:
+    """
+    A single validated action of a batch, ready to be performed
+    """
+    def __init__(self, device_name, action: DeviceAction):
+        self.device_name = device_name
+        self.action = action
+
+    def submit(self) -> Future:
+        """
+        Queues the action on the ActionExecutor
+        """
+        return action_executor.submit(self.action)
+
+    def result_from(self, future: Future) -> dict:
+        """
+        Waits for the submitted action, returning the result to include in
+        the response
+        """
+        try:
+            response = future.result()
+        except Exception as e:
+            return self.result('failed', error=repr(e))
+
+        status = 'failed' if response['status'] > 0 else 'done'
+
+        return self.result(status, response=response)
+
+    def result(self, status, **kwargs) -> dict:
+        return {
+            'device': self.device_name,
+            'action': self.action.name,
+            'status': status,
+            **kwargs
+        }
+
+
+def validate_batch(items: List[dict], device_name: Optional[str] = None,
+                   context=None) -> List[BatchItem]:
+    """
+    Validates every item of the batch up front (using each action's argmap),
+    so that no action is performed if any of them are invalid
+    :param items: List of dicts with "action", "args" and (if no device_name
+                  is given) "device" keys
+    :param device_name: The device all items are for, or None if each item
+                        specifies its own device
+    :return: A list of BatchItems with their args initialized
+    :raises: APIInvalidError (400) with the errors of each invalid item, by
+             the item's index
+    """
+    if len(items) > MAX_BATCH_SIZE:
+        raise APIInvalidError(400, f'Batches are limited to {MAX_BATCH_SIZE} items')
+
+    batch = []
+    # Map of item index to its errors, in marshmallow's (possibly nested)
+    # {field: messages} form
+    errors = {}
+
+    for ndx, item in enumerate(items):
+        try:
+            item = BATCH_ITEM_SCHEMA.load(item)
+        except ValidationError as e:
+            errors[ndx] = e.normalized_messages()
+            continue
+
+        item_device_name = device_name or item['device']
+
+        try:
+            device = device_registry.view(item_device_name, context=context)
+        except KeyError:
+            errors[ndx] = {'device': [f'No device found for {item_device_name}']}
+            continue
+
+        try:
+            spec = device.action_spec(item['action'])
+        except KeyError:
+            errors[ndx] = {'action': [f'No action found for {item["action"]}']}
+            continue
+
+        try:
+            parsed_args = spec.schema.load(item['args'] or {})
+        except ValidationError as e:
+            errors[ndx] = {'args': e.normalized_messages()}
+            continue
+
+        action = device.action(spec.name)
+        action.init_args(**parsed_args)
+        batch.append(BatchItem(item_device_name, action))
+
+    if errors:
+        raise APIInvalidError(400, 'Invalid batch items', payload={'errors': errors})
+
+    return batch
+
+
+def run_batch(batch: List[BatchItem], parallel=False, stop_on_error=True) -> List[dict]:
+    """
+    Performs every item of the batch, either in order or concurrently
+    :param stop_on_error: If running in order, whether to skip the remaining
+                          items once one fails
+    :return: A list of the results for each item (in the same order)
+    """
+    if parallel:
+        # The executor keeps each device's items in order, while running
+        # different devices concurrently
+        futures = [item.submit() for item in batch]
+
+        return [
+            item.result_from(future)
+            for item, future in zip(batch, futures)
+        ]
+
+    results = []
+    failed = False
+
+    for item in batch:
+        if failed and stop_on_error:
+            results.append(item.result('skipped'))
+            continue
+
+        result = item.result_from(item.submit())
+        failed = failed or result['status'] == 'failed'
+        results.append(result)
+
+    return results
@@ -0,0 +1,122 @@
+"""
+This file contains the DeviceCatalog, a precompiled (and versioned) snapshot of
+the JSON served for the devices & their actions.
+"""
+import hashlib
+import json
+import threading
+
+from typing import Dict, NamedTuple, Tuple
+
+from smart_home_hub.device import device_registry
+from smart_home_hub.device.registry import DeviceRegistry
+from .device_resource import device_resp_obj
+
+
+class CatalogEntry(NamedTuple):
+    """
+    A serialized slice of the catalog, along with its content hash
+    """
+    body: bytes
+    etag: str
+
+    @classmethod
+    def from_obj(cls, obj):
+        body = json.dumps(obj, sort_keys=True).encode('utf-8')
+
+        return cls(
+            body=body,
+            etag=hashlib.sha1(body).hexdigest()
+        )
+
+
+class CatalogSnapshot(NamedTuple):
+    """
+    An immutable compiled catalog. Entries are keyed by () for the full list of
+    devices, (device_name,) for a device, and (device_name, action_name) for
+    an action.
+    """
+    version: int
+    registry_version: int
+    entries: Dict[Tuple[str, ...], CatalogEntry]
+
+
+class DeviceCatalog:
+    """
+    Compiles the device catalog once, and serves it until the registry
+    changes (or invalidate() is called), so that polling clients do not cause
+    the catalog to be rebuilt and re-encoded on every request.
+    """
+    def __init__(self, registry: DeviceRegistry):
+        self.registry = registry
+
+        self._snapshot = None
+        self._version = 0
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        """
+        Version of the catalog, incremented every time its content changes
+        """
+        return self._version
+
+    def snapshot(self) -> CatalogSnapshot:
+        """
+        Returns the current snapshot, compiling a new one if the registry has
+        changed since it was built
+        """
+        snapshot = self._snapshot
+
+        if snapshot is None or snapshot.registry_version != self.registry.version:
+            snapshot = self.compile()
+
+        return snapshot
+
+    def entry(self, *key) -> CatalogEntry:
+        """
+        Returns the entry for the given key (see CatalogSnapshot)
+        :raises: KeyError if no such device or action exists
+        """
+        return self.snapshot().entries[key]
+
+    def compile(self) -> CatalogSnapshot:
+        """
+        Builds a new snapshot from the registry's devices
+        """
+        with self._lock:
+            registry_version = self.registry.version
+            entries = {}
+            device_objs = []
+
+            for device_name in self.registry.names():
+                device_obj = device_resp_obj(self.registry.view(device_name))
+                device_objs.append(device_obj)
+
+                entries[(device_name,)] = CatalogEntry.from_obj(device_obj)
+                for action_obj in device_obj['actions']:
+                    entries[(device_name, action_obj['name'])] = \
+                        CatalogEntry.from_obj(action_obj)
+
+            entries[()] = CatalogEntry.from_obj(device_objs)
+
+            old_snapshot = self._snapshot
+            if old_snapshot is None or old_snapshot.entries[()] != entries[()]:
+                self._version += 1
+
+            self._snapshot = CatalogSnapshot(
+                version=self._version,
+                registry_version=registry_version,
+                entries=entries
+            )
+
+            return self._snapshot
+
+    def invalidate(self):
+        """
+        Drops the current snapshot, so the next request compiles a new one
+        """
+        self._snapshot = None
+
+
+device_catalog = DeviceCatalog(device_registry)
@@ -1,15 +1,15 @@
-from smart_home_hub.device.base_device import Device, DeviceAction
+from smart_home_hub.device.base_device import ActionSpec, Device
 from .utils import argmap_resp_obj
 
 
-def action_resp_obj(action: DeviceAction) -> dict:
+def action_resp_obj(action: ActionSpec) -> dict:
     """
-    Returns a JSON compatible version of a DeviceAction object
+    Returns a JSON compatible version of a DeviceAction's metadata
     """
     return {
         'name': action.name,
         'description': action.description,
-        'argmap': argmap_resp_obj(action.argmap())
+        'argmap': argmap_resp_obj(action.argmap)
     }
 
 
@@ -18,14 +18,16 @@ def device_resp_obj(device: Device) -> dict:
     Returns a JSON compatible version of a device object to include in a
     response
     """
+    action_objs = [
+        action_resp_obj(spec) for spec in device.action_specs()
+    ]
+
     return {
         'name': device.name,
         'description': device.description,
-        'actions': [
-            action_resp_obj(a) for a in device.actions()
-        ],
+        'actions': action_objs,
         'action_map': {
-            a_name: action_resp_obj(a)
-            for a_name, a in device.action_map().items()
+            action_obj['name']: action_obj
+            for action_obj in action_objs
         }
     }
@@ -0,0 +1,142 @@
+"""
+This file contains the JobManager, used to run slow actions in the background
+so the API can respond immediately with a job ID to poll.
+"""
+import threading
+import time
+import uuid
+
+from concurrent.futures import CancelledError, Future, TimeoutError
+from typing import Optional
+
+from smart_home_hub.device import action_executor
+from smart_home_hub.device.base_device import DeviceAction
+
+# Longest a client can block waiting on a job in one request
+MAX_WAIT_SECONDS = 30
+# How long finished jobs are kept around for clients to retrieve
+FINISHED_JOB_TTL_SECONDS = 60 * 60
+
+
+class Job:
+    """
+    A single action being run in the background
+    """
+    def __init__(self, device_name, action_name, future: Future):
+        self.id = uuid.uuid4().hex
+        self.device_name = device_name
+        self.action_name = action_name
+        self.future = future
+
+        self.created_at = time.time()
+        self.finished_at = None
+
+        future.add_done_callback(self._set_finished)
+
+    @property
+    def status(self) -> str:
+        if not self.future.done():
+            return 'running' if self.future.running() else 'pending'
+        if self.future.cancelled() or self.future.exception() is not None:
+            return 'failed'
+        return 'done'
+
+    def wait(self, timeout=None):
+        """
+        Blocks until the job is finished, or the timeout (in seconds) passes
+        """
+        try:
+            self.future.exception(timeout=timeout)
+        except (CancelledError, TimeoutError):
+            pass
+
+    def to_dict(self) -> dict:
+        """
+        Returns a JSON compatible version of the job, including the action's
+        response once it is done
+        """
+        status = self.status
+        job_dict = {
+            'job_id': self.id,
+            'device': self.device_name,
+            'action': self.action_name,
+            'status': status,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at
+        }
+
+        if status == 'done':
+            job_dict['response'] = self.future.result()
+        elif status == 'failed':
+            job_dict['error'] = (
+                'Cancelled' if self.future.cancelled()
+                else repr(self.future.exception())
+            )
+
+        return job_dict
+
+    def _set_finished(self, _):
+        self.finished_at = time.time()
+
+
+class JobManager:
+    """
+    Runs actions in the background through the ActionExecutor, keeping track
+    of each as a Job
+    """
+    def __init__(self, finished_job_ttl=FINISHED_JOB_TTL_SECONDS):
+        """
+        :param finished_job_ttl: Seconds to keep finished jobs retrievable
+        """
+        self.finished_job_ttl = finished_job_ttl
+
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, device_name, action: DeviceAction) -> Job:
+        """
+        Queues the (initialized) action to be performed in the background
+        :return: The Job tracking the action
+        :raises: ExecutorFullError if the device has too many pending actions
+        """
+        job = Job(
+            device_name,
+            action.name,
+            action_executor.submit(action, block=False)
+        )
+
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+
+        return job
+
+    def get(self, job_id, wait: Optional[float] = None) -> Job:
+        """
+        Returns the job with the given ID
+        :param wait: If given, blocks up to this many seconds (capped to
+                     MAX_WAIT_SECONDS) for the job to finish
+        :raises: KeyError if no such job exists (or it has expired)
+        """
+        with self._lock:
+            job = self._jobs[job_id]
+
+        if wait is not None:
+            job.wait(timeout=min(max(wait, 0), MAX_WAIT_SECONDS))
+
+        return job
+
+    def _prune(self):
+        """
+        Removes finished jobs past their TTL (must hold self._lock)
+        """
+        cutoff = time.time() - self.finished_job_ttl
+
+        for job_id in [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]:
+            del self._jobs[job_id]
+
+
+job_manager = JobManager()
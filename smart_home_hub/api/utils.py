@@ -85,6 +85,7 @@ class APIInvalidError(Exception):
         status.HTTP_405_METHOD_NOT_ALLOWED: "Method Not Allowed",
         status.HTTP_406_NOT_ACCEPTABLE: "Not Acceptable",
         status.HTTP_500_INTERNAL_SERVER_ERROR: "Internal Server Error",
+        status.HTTP_503_SERVICE_UNAVAILABLE: "Service Unavailable",
         None: ""
     }
 
@@ -1,5 +1,15 @@
-from .devices.roku import RokuDevice
+from .devices.roku import RokuDevice, RokuFleetDevice
+from .executor import ActionExecutor
+from .registry import DeviceRegistry
 
+# NOTE: roku_fleet comes before roku, so the VUI matches "roku fleet ..." to
+#       the fleet instead of the single Roku
 device_class_map = {
+    RokuFleetDevice.dev_name(): RokuFleetDevice,
     RokuDevice.dev_name(): RokuDevice
 }
+
+# Shared device instances, used by both the API and VUI threads
+device_registry = DeviceRegistry(device_class_map)
+# Every action (from the API or VUI) is performed through this
+action_executor = ActionExecutor(max_workers=8)
@@ -1,7 +1,8 @@
 from abc import ABCMeta, abstractmethod
-from copy import deepcopy
-from marshmallow import fields
-from typing import List, Dict
+from copy import copy, deepcopy
+from marshmallow import Schema, fields
+from types import MappingProxyType
+from typing import Dict, Hashable, List, Mapping, NamedTuple, Type
 
 from ..utils.utils import DescClass
 
@@ -13,6 +14,20 @@ class EarlyExitError(Exception):
     """
 
 
+class ActionSpec(NamedTuple):
+    """
+    Immutable metadata for a DeviceAction, built once per device so that
+    listing actions does not require building (and discarding) new actions
+    """
+    name: str
+    description: str
+    argmap: Mapping
+    # Compiled schema for the argmap, to pass to the webargs parser
+    schema: Schema
+    # The DeviceAction.argmap_key() the spec was built for
+    key: Hashable
+
+
 class DeviceAction(DescClass, metaclass=ABCMeta):
     """
     An Action that can be taken on a device. Specifies what arguments can
@@ -24,6 +39,9 @@ class DeviceAction(DescClass, metaclass=ABCMeta):
     _name must be specified (and be unique)
     _desc can be specified to give information on the action performed.
     """
+    # Compiled schemas, keyed by (action class, argmap key)
+    _schema_cache = {}
+
     def __init__(self, device):
         super().__init__()
         self.device = device
@@ -41,6 +59,44 @@ class DeviceAction(DescClass, metaclass=ABCMeta):
         # TODO: Some kind of argument check here that the args are from argmap
         self.args = deepcopy(kwargs)
 
+    @classmethod
+    def is_available(cls, device) -> bool:
+        """
+        Returns whether this action can be used by the given device (e.g. if
+        it relies on optional functionality of the device)
+        """
+        return True
+
+    @classmethod
+    def argmap_key(cls, device) -> Hashable:
+        """
+        Returns a hashable key for the argmap this action would have on the
+        given device. Must change whenever argmap() would return different
+        fields, as cached specs & schemas are invalidated based on it.
+
+        By default argmaps are assumed to be fixed for each class.
+        """
+        return None
+
+    @classmethod
+    def compiled_schema(cls, argmap, key) -> Schema:
+        """
+        Returns the (cached) marshmallow Schema for this class's argmap
+        :param argmap: The argmap to compile, if not already cached
+        :param key: The argmap_key() of this argmap
+        """
+        cache_key = (cls, key)
+        schema = cls._schema_cache.get(cache_key)
+
+        if schema is None:
+            schema = Schema.from_dict(
+                dict(argmap),
+                name=f'{cls.__name__}Schema'
+            )()
+            cls._schema_cache[cache_key] = schema
+
+        return schema
+
     @abstractmethod
     def argmap(self) -> dict:
         """
@@ -89,7 +145,7 @@ class DeviceAction(DescClass, metaclass=ABCMeta):
         :param action_args: Any named arguments to set for the action
         :return: The response generated by performing the other action
         """
-        other_action = self.device.action_map()[action_name]
+        other_action = self.device.action(action_name)
         other_action.init_args(**action_args)
         other_action.perform()
         resp = other_action.response()
@@ -136,9 +192,9 @@ class ListActionArgs(DeviceAction):
         # TODO: Make this more descriptive? Maybe list the requirements too
         self.set_msg(
             ', '.join(
-                self.device.action_map()[
+                self.device.action_spec(
                     self.args['action'].lower()
-                ].argmap().keys()
+                ).argmap.keys()
             )
         )
 
@@ -148,10 +204,22 @@ class Device(DescClass, metaclass=ABCMeta):
     Device class that is used for interacting with a device. Contains
     information (usually URL's and any API keys) for contacting the device,
     and a list of actions that can be performed.
+
+    _action_classes should list every DeviceAction class for the device
+    (including those of any parent class). They are indexed once per class.
     """
+    _action_classes = [
+        ListActions,
+        ListActionArgs
+    ]
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
+        # NOTE: Mutated in place (never reassigned), so it is shared with any
+        #       views of this device
+        self._action_specs = {}
+
     @classmethod
     def dev_name(cls):
         return cls._name
@@ -160,34 +228,138 @@ class Device(DescClass, metaclass=ABCMeta):
     def dev_desc(cls):
         return cls._desc
 
-    @abstractmethod
-    def actions(self) -> List[DeviceAction]:
+    def executor_key(self) -> str:
         """
-        Should return a list of all available actions for this device
+        Returns the key of the ActionExecutor queue for this device. Actions
+        with the same key are always run one at a time, in order.
         """
-        return [
-            ListActions(self),
-            ListActionArgs(self)
-        ]
+        return self.name
+
+    def with_context(self, context):
+        """
+        Returns a request-scoped view of this device. The view is a shallow
+        copy, so it shares any expensive state (configs, clients, etc.) with
+        this instance.
+        :param context: The context to bind the view to (ignored by devices
+                        that do not use a context)
+        """
+        return copy(self)
+
+    def start(self):
+        """
+        Lifecycle hook called once by the DeviceRegistry after the device is
+        built, before it is used to serve any requests
+        """
+        # Building the specs (and compiling their schemas) up front
+        self.action_specs()
+
+    def refresh(self):
+        """
+        Lifecycle hook to reload any state (configs, clients, etc.) that may
+        have gone stale while the device was running
+        """
+        self._action_specs.clear()
+
+    def shutdown(self):
+        """
+        Lifecycle hook called once when the process is shutting down, to
+        release any resources held by the device
+        """
+
+    @classmethod
+    def action_class_map(cls) -> Dict[str, Type[DeviceAction]]:
+        """
+        Returns a map of name: Action class pairs for this device class. This
+        is only built once per class.
+        """
+        # Checking cls.__dict__ so subclasses never use their parent's index
+        if '_action_class_index' not in cls.__dict__:
+            index = {}
+
+            for action_cls in cls._action_classes:
+                if action_cls._name is None:
+                    raise ValueError(f'_name must be specified for {action_cls}')
+                if action_cls._name in index:
+                    raise ValueError(f'Non-unique name {action_cls._name} for Action')
+
+                index[action_cls._name] = action_cls
+
+            cls._action_class_index = index
+
+        return cls._action_class_index
 
     def action_names(self) -> List[str]:
         """
         Returns a list of the action names for the device
         """
         return [
-            action.name for action in self.actions()
+            action_name
+            for action_name, action_cls in self.action_class_map().items()
+            if action_cls.is_available(self)
         ]
 
-    def action_map(self) -> Dict[str, DeviceAction]:
+    def action(self, action_name) -> DeviceAction:
+        """
+        Returns a new instance of the action with the given name, ready to have
+        its args initialized and be performed
+        :raises: KeyError if the device has no such action
+        """
+        action_cls = self.action_class_map()[action_name]
+        if not action_cls.is_available(self):
+            raise KeyError(action_name)
+
+        return action_cls(self)
+
+    def action_spec(self, action_name) -> ActionSpec:
         """
-        Returns a map of name: Action pairs for this device
+        Returns the (cached) metadata for the action with the given name
+        :raises: KeyError if the device has no such action
         """
-        action_map = {}
+        action_cls = self.action_class_map()[action_name]
+        if not action_cls.is_available(self):
+            raise KeyError(action_name)
+
+        key = action_cls.argmap_key(self)
+        spec = self._action_specs.get(action_name)
+
+        if spec is None or spec.key != key:
+            argmap = action_cls(self).argmap()
+            spec = ActionSpec(
+                name=action_cls._name,
+                description=action_cls._desc,
+                argmap=MappingProxyType(argmap),
+                schema=action_cls.compiled_schema(argmap, key),
+                key=key
+            )
+            self._action_specs[action_name] = spec
 
-        for action in self.actions():
-            if action.name in action_map:
-                raise ValueError(f'Non-unique name {action.name} for Action')
+        return spec
 
-            action_map[action.name] = action
+    def action_specs(self) -> List[ActionSpec]:
+        """
+        Returns the metadata for all available actions of this device
+        """
+        return [
+            self.action_spec(action_name)
+            for action_name in self.action_names()
+        ]
 
-        return action_map
+    def actions(self) -> List[DeviceAction]:
+        """
+        Returns a list of new instances of all available actions for this
+        device
+        """
+        return [
+            self.action(action_name)
+            for action_name in self.action_names()
+        ]
+
+    def action_map(self) -> Dict[str, DeviceAction]:
+        """
+        Returns a map of name: Action pairs for this device (prefer action()
+        when only one action is needed)
+        """
+        return {
+            action_name: self.action(action_name)
+            for action_name in self.action_names()
+        }
@@ -1,7 +1,8 @@
-from abc import ABCMeta, abstractmethod
-from typing import List
+from abc import ABCMeta
 
 from .base_device import Device, DeviceAction
+from smart_home_hub.utils.argmap_utils import argmap_fingerprint
+from smart_home_hub.utils.config import Config
 
 
 class UpdateConfig(DeviceAction):
@@ -13,6 +14,11 @@ class UpdateConfig(DeviceAction):
         Updates the Device Configuration for the given arguments. 
     """
 
+    @classmethod
+    def argmap_key(cls, device):
+        # The argmap changes along with the device's config map
+        return argmap_fingerprint(device.config.config_map())
+
     def argmap(self) -> dict:
         return self.device.config.config_map()
 
@@ -32,12 +38,26 @@ class ConfigurableDevice(Device, metaclass=ABCMeta):
     """
     _conf_class = None
 
+    _action_classes = Device._action_classes + [
+        UpdateConfig
+    ]
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.config = self._conf_class()
-
-    @abstractmethod
-    def actions(self) -> List[DeviceAction]:
-        return super().actions() + [
-            UpdateConfig(self)
-        ]
+        self.config = self.build_config()
+
+    def build_config(self) -> Config:
+        """
+        Builds the config for this device (can be overridden if the config
+        needs arguments)
+        """
+        return self._conf_class()
+
+    def refresh(self):
+        super().refresh()
+
+        try:
+            self.config.load()
+        except FileNotFoundError:
+            # Config was never saved, so the defaults are still current
+            pass
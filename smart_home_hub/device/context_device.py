@@ -18,6 +18,12 @@ class ContextDevice(Device, metaclass=ABCMeta):
         super().__init__(*args, **kwargs)
         self.context = context
 
+    def with_context(self, context):
+        view = super().with_context(context)
+        view.context = context
+
+        return view
+
     def save_context(self):
         """
         Saves the current context object into the appropriate location
@@ -1 +1,2 @@
 from .roku_device import RokuDevice
+from .fleet import RokuFleetDevice
@@ -0,0 +1,298 @@
+"""
+This file contains the ChannelIndex, which maps channel (service) names to the
+app IDs installed on a Roku, built from the Roku's own list of apps.
+"""
+import re
+import threading
+import time
+import requests
+import xml.etree.ElementTree as ET
+
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Dict, Optional, Union
+
+from .ecp_client import ECPClient
+from smart_home_hub.utils.config import Config, ConfigMap, load_config
+
+# Hand maintained map of channel names to app IDs, which overrides the apps
+# found on the Roku
+CHANNEL_OVERRIDES_PATH = 'roku/content/channel_id_map.json'
+# Seconds before the installed apps are fetched from the Roku again
+DEFAULT_APPS_TTL = 24 * 60 * 60
+# Seconds to wait after a failed fetch of the installed apps before trying
+# again (ex: while the Roku is unplugged)
+DEFAULT_RETRY_INTERVAL = 5 * 60
+
+# Words too generic to identify an app by on their own
+GENERIC_WORDS = {
+    'and', 'app', 'channel', 'go', 'max', 'music', 'now', 'plus', 'the', 'tv',
+    'video'
+}
+
+
+def channel_words(name):
+    """
+    Returns the normalized words of a channel name, ex: "Disney+" ->
+    ["disney", "plus"]
+    """
+    name = name.lower().replace('&', ' and ').replace('+', ' plus ')
+
+    return re.sub(r'[^a-z0-9]+', ' ', name).split()
+
+
+def channel_aliases(name):
+    """
+    Returns the names a channel can be referred to by, from most to least
+    specific, ex: "Prime Video" -> ["prime_video", "primevideo", "prime"]
+    """
+    words = channel_words(name)
+    if not words:
+        return []
+
+    aliases = ['_'.join(words), ''.join(words)]
+    aliases.extend([
+        word for word in words if word not in GENERIC_WORDS
+    ])
+
+    return list(dict.fromkeys(aliases))
+
+
+class InstalledAppsConfig(Config):
+    """
+    Internal config persisting the apps last fetched from a Roku, of the form
+    {"fetched_at": <timestamp>, "apps": {<app ID>: <app name>, ...}}
+    """
+
+    def __init__(self, member=None):
+        """
+        :param member: Name of the Roku in the fleet, or None for the main Roku
+        """
+        self.member = member
+        super().__init__()
+
+    def rel_filepath(self) -> str:
+        if self.member is None:
+            return 'roku/content/installed_apps.json'
+
+        return f'roku/content/installed_apps_{self.member}.json'
+
+    @classmethod
+    def config_map(cls) -> Union[ConfigMap, dict]:
+        return {
+            'fetched_at': 0,
+            'apps': {}
+        }
+
+
+class ChannelMap(Mapping):
+    """
+    A read-only map of channel names to app IDs. Lookups try the overrides,
+    then the aliases of every installed app, then a unique prefix of an app's
+    name (ex: "crunchy" -> Crunchyroll).
+    """
+    def __init__(self, apps: Dict[str, str], overrides: Dict[str, Union[int, str]]):
+        """
+        :param apps: Map of the installed app IDs to their names
+        :param overrides: Map of channel names to app IDs, which take priority
+        """
+        self.overrides = {
+            name.lower(): app_id for name, app_id in overrides.items()
+        }
+
+        # The more specific aliases of each app are added first, so they
+        # win over the less specific aliases of other apps
+        self.aliases = {}
+        app_aliases = {
+            app_id: channel_aliases(app_name) for app_id, app_name in apps.items()
+        }
+        for ndx in range(max([len(a) for a in app_aliases.values()], default=0)):
+            for app_id, aliases in app_aliases.items():
+                if ndx < len(aliases):
+                    self.aliases.setdefault(aliases[ndx], app_id)
+
+        # Sorted compact names, for prefix lookups
+        self._prefixes = sorted(
+            (''.join(channel_words(app_name)), app_id)
+            for app_id, app_name in apps.items()
+        )
+
+    def lookup(self, name) -> Optional[Union[int, str]]:
+        """
+        Returns the app ID for the channel name, or None if not found
+        """
+        if name is None:
+            return None
+
+        key = name.lower()
+        if key in self.overrides:
+            return self.overrides[key]
+
+        words = channel_words(name)
+        for alias in ['_'.join(words), ''.join(words)]:
+            if alias in self.aliases:
+                return self.aliases[alias]
+
+        prefix = ''.join(words)
+        if not prefix:
+            return None
+
+        ndx = bisect_left(self._prefixes, (prefix,))
+        matches = []
+        while ndx < len(self._prefixes) and self._prefixes[ndx][0].startswith(prefix):
+            matches.append(self._prefixes[ndx][1])
+            ndx += 1
+
+        if len(set(matches)) == 1:
+            return matches[0]
+
+        return None
+
+    def __getitem__(self, name):
+        app_id = self.lookup(name)
+        if app_id is None:
+            raise KeyError(name)
+
+        return app_id
+
+    def __contains__(self, name):
+        return self.lookup(name) is not None
+
+    def __iter__(self):
+        return iter(dict.fromkeys(list(self.overrides) + list(self.aliases)))
+
+    def __len__(self):
+        return len(dict.fromkeys(list(self.overrides) + list(self.aliases)))
+
+
+class ChannelIndex:
+    """
+    Keeps a ChannelMap for a Roku, built from its installed apps (fetched from
+    ECP /query/apps) with the channel_id_map.json file as an override layer.
+    The apps are persisted, and refreshed in the background once older than
+    the TTL.
+    """
+    def __init__(self, ecp: ECPClient, member=None, ttl=DEFAULT_APPS_TTL,
+                 retry_interval=DEFAULT_RETRY_INTERVAL):
+        """
+        :param ecp: Client to query the Roku with
+        :param member: Name of the Roku in the fleet, or None for the main Roku
+        :param ttl: Seconds before the installed apps are fetched again
+        :param retry_interval: Seconds between attempts to fetch the apps
+                               while the Roku can't be reached
+        """
+        self.ecp = ecp
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self.apps_config = InstalledAppsConfig(member=member)
+
+        self._channel_map = None
+        # Version (in config_store) of the overrides the map was built with
+        self._overrides_version = None
+        # When the apps were last fetched (or tried to be), successful or not
+        self._attempted_at = 0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def channel_map(self) -> ChannelMap:
+        """
+        Returns the current ChannelMap. If the installed apps are stale, the
+        current map is still returned while they are refreshed in the
+        background (or fetched first if there is no map yet). The map is
+        rebuilt whenever the overrides file changes.
+        """
+        with self._lock:
+            channel_map = self._channel_map
+            now = time.time()
+            is_stale = (
+                now - self.apps_config['fetched_at'] > self.ttl
+                and now - self._attempted_at > self.retry_interval
+            )
+
+            if channel_map is None:
+                if is_stale:
+                    self._attempted_at = now
+                    self._store_apps(self._fetch_apps())
+                return self._build_map()
+
+            if load_config(CHANNEL_OVERRIDES_PATH).version != self._overrides_version:
+                channel_map = self._build_map()
+
+            if is_stale and not self._refreshing:
+                self._attempted_at = now
+                self._refreshing = True
+                threading.Thread(
+                    target=self._background_refresh,
+                    name='shh-roku-channels',
+                    daemon=True
+                ).start()
+
+            return channel_map
+
+    def refresh(self):
+        """
+        Fetches the installed apps from the Roku, and rebuilds the map
+        """
+        # Fetched without holding the lock, so the current map can still be
+        # used while waiting on the Roku
+        apps = self._fetch_apps()
+
+        with self._lock:
+            self._store_apps(apps)
+            self._build_map()
+
+    def invalidate(self):
+        """
+        Drops the current map, so it is rebuilt (reloading the overrides) on
+        next use
+        """
+        with self._lock:
+            self._channel_map = None
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _fetch_apps(self) -> Optional[Dict[str, str]]:
+        """
+        Helper method to fetch the installed apps, returning None if the Roku
+        can't be reached
+        """
+        try:
+            resp = self.ecp.query('/query/apps')
+            resp.raise_for_status()
+            apps = ET.fromstring(resp.content)
+        except (requests.RequestException, ET.ParseError, KeyError):
+            # KeyError if the Roku's IP has never been set
+            return None
+
+        return {
+            app.get('id'): (app.text or '').strip()
+            for app in apps.findall('app')
+            if app.get('id') is not None
+        }
+
+    def _store_apps(self, apps: Optional[Dict[str, str]]):
+        """
+        Helper method to persist the fetched apps (must hold self._lock).
+        Keeps the previous apps if they couldn't be fetched.
+        """
+        if apps is None:
+            return
+
+        self.apps_config['apps'] = apps
+        self.apps_config['fetched_at'] = time.time()
+        self.apps_config.save()
+
+    def _build_map(self) -> ChannelMap:
+        """
+        Helper method to rebuild the map (must hold self._lock)
+        """
+        overrides = load_config(CHANNEL_OVERRIDES_PATH)
+        self._channel_map = ChannelMap(self.apps_config['apps'], dict(overrides))
+        self._overrides_version = overrides.version
+
+        return self._channel_map
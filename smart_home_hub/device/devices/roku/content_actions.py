@@ -1,14 +1,24 @@
-import random
 import requests
 
 from abc import ABCMeta
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from marshmallow import fields
+from typing import Optional
 
+from .content_index import content_index
+from .name_index import fold_name
+from .title_index import rg_title_index
 from smart_home_hub.device.base_device import DeviceAction
-from smart_home_hub.utils.config import load_config
 
 # TODO: Add a contentID search for things that support it, like youtube
 
+# Max search results to fetch the service ID's of when playing a movie/show
+MAX_CANDIDATES = 5
+# Max candidates looked up at once. The rest are only looked up if the earlier
+# ones turn out to be incompatible
+CANDIDATE_WORKERS = 2
+
 
 class ContentAction(DeviceAction, metaclass=ABCMeta):
 
@@ -22,21 +32,29 @@ class ContentAction(DeviceAction, metaclass=ABCMeta):
                            (Netflix episodes & shows can be found online manually)
         :param media_type: One of season, episode, movie, short-form, special, live
         """
-        requests.post(
-            self.device.config['ip'] + f'launch/{app_id}',
-            params={
-                'contentID': content_id,
-                'mediaType': media_type
-            }
-        )
+        if self.device.skip_redundant and self.device.state.active_app() == str(app_id):
+            # Deep linking into the running app, instead of relaunching it
+            self.device.ecp.input(
+                app_id,
+                contentID=content_id,
+                mediaType=media_type
+            )
+        else:
+            self.device.ecp.launch(
+                app_id,
+                contentID=content_id,
+                mediaType=media_type
+            )
 
-    @staticmethod
-    def channel_id_map():
+        self.device.state.update(active_app=app_id)
+
+    def channel_id_map(self):
         """
-        Loads the config for channel_id_map.json
-        :return: A dict containing a map of the channel names to ID's
+        Returns the device's map of channel names to app ID's, built from the
+        apps installed on the Roku (with channel_id_map.json as overrides)
+        :return: A ChannelMap of the channel names to ID's
         """
-        return load_config('roku/content/channel_id_map.json')
+        return self.device.channels.channel_map()
 
 
 class RGPlayContent(ContentAction, metaclass=ABCMeta):
@@ -45,6 +63,10 @@ class RGPlayContent(ContentAction, metaclass=ABCMeta):
     """
     _content_type = None
 
+    @classmethod
+    def is_available(cls, device) -> bool:
+        return device.rg_client is not None
+
     def argmap(self) -> dict:
         return {
             'title': fields.Str(
@@ -67,6 +89,26 @@ class RGPlayContent(ContentAction, metaclass=ABCMeta):
 
         channel_id_map = self.channel_id_map()
 
+        def is_compatible(s):
+            return s in channel_id_map and (service is None or s == service)
+
+        # Titles on the watchlists are resolved without searching Reelgood
+        match = rg_title_index.match(content_str, title)
+        if match is not None:
+            streaming_ids = match.streaming_ids
+            if self._content_type == 'show':
+                # The next episode changes after every watch, so it's always
+                # looked up
+                try:
+                    streaming_ids = self.device.rg_client.get_show_viewing_id(match.rg_id)
+                except (requests.RequestException, KeyError, TypeError, ValueError):
+                    streaming_ids = {}
+
+            for s, content_id in streaming_ids.items():
+                if is_compatible(s):
+                    self.open_content(channel_id_map[s], content_id, self._content_type)
+                    return
+
         content_list = self.device.rg_client.query_content(content_str, title)
 
         if len(content_list) == 0:
@@ -75,33 +117,90 @@ class RGPlayContent(ContentAction, metaclass=ABCMeta):
             )
             return
 
-        if self._content_type == 'movie':
-            service_id_map = self.device.rg_client.get_movie_viewing_id(
-                content_list[0]['id']
-            )
-        else:
-            service_id_map = self.device.rg_client.get_show_viewing_id(
-                content_list[0]['id']
-            )
-
-        if service is None:
-            services = [
-                s for s in service_id_map.keys()
-                if s in channel_id_map
-            ]
+        candidate = self.best_candidate(
+            self.rank_candidates(content_list, title),
+            is_compatible
+        )
 
-            if len(services) == 0:
-                self.set_msg(f"Could not find compatible service")
-                return
+        if candidate is None:
+            self.set_msg(f"Could not find compatible service")
+            return
 
-            service = services[0]
+        service, content_id = candidate
 
         self.open_content(
             channel_id_map[service],
-            service_id_map[service],
+            content_id,
             self._content_type
         )
 
+    @staticmethod
+    def rank_candidates(content_list, title):
+        """
+        Returns the top search results to consider, with exact title matches
+        first (otherwise keeping Reelgood's order)
+        """
+        folded_title = fold_name(title)
+        ranked = sorted(
+            content_list,
+            key=lambda content: fold_name(content.get('title', '')) != folded_title
+        )
+
+        return ranked[:MAX_CANDIDATES]
+
+    def best_candidate(self, candidates, is_compatible) -> Optional[tuple]:
+        """
+        Fetches the service ID's of the candidates in order, with at most
+        CANDIDATE_WORKERS in flight, and returns the (service, content ID) of
+        the first candidate with a compatible service. A candidate is only
+        looked up once an earlier one turns out to be incompatible, so
+        usually only one or two lookups are made.
+        :param candidates: Search results, in order of preference
+        :param is_compatible: Function returning whether a service can be used
+        :return: The (service, content ID) to play, or None if no candidate has
+                 a compatible service
+        """
+        if self._content_type == 'movie':
+            get_viewing_id = self.device.rg_client.get_movie_viewing_id
+        else:
+            get_viewing_id = self.device.rg_client.get_show_viewing_id
+
+        pool = ThreadPoolExecutor(
+            max_workers=CANDIDATE_WORKERS,
+            thread_name_prefix='shh-rg-candidates'
+        )
+        remaining = iter(candidates)
+        futures = deque()
+
+        def submit_next():
+            content = next(remaining, None)
+            if content is not None:
+                futures.append(pool.submit(get_viewing_id, content['id']))
+
+        for _ in range(CANDIDATE_WORKERS):
+            submit_next()
+
+        try:
+            # Waiting on each candidate in order, so a later candidate only
+            # wins once every earlier one is known to be incompatible
+            while futures:
+                try:
+                    service_id_map = futures.popleft().result()
+                except (requests.RequestException, KeyError, TypeError, ValueError):
+                    # Treating a candidate we can't look up as incompatible
+                    service_id_map = {}
+
+                for s, content_id in service_id_map.items():
+                    if is_compatible(s):
+                        return s, content_id
+
+                submit_next()
+
+            return None
+
+        finally:
+            pool.shutdown(wait=False)
+
 
 class PlayMovie(RGPlayContent):
     _name = 'play_movie'
@@ -135,11 +234,14 @@ class PlayContent(ContentAction):
         service = self.args['service']
         content = self.args['content']
 
-        content_id_map = load_config('roku/content/content_id_map.json')
+        match = content_index.content_ids().lookup(service, content)
         try:
+            if match is None:
+                raise KeyError(content)
+
             self.open_content(
-                self.channel_id_map()[service],
-                content_id_map[service][content],
+                self.channel_id_map()[match.service],
+                match.content_id,
                 'episode'
             )
         except KeyError:
@@ -162,33 +264,23 @@ class PlayRandom(ContentAction):
         }
 
     def perform(self):
-        ep_ranges_map = load_config('roku/content/random_episode_ranges.json')
+        index = content_index.episodes()
 
         if self.args['show'] == 'any':
-            channel_name = random.choice(list(ep_ranges_map.keys()))
-            show_name = random.choice(list(ep_ranges_map[channel_name].keys()))
+            episode = index.random_episode()
+            if episode is None:
+                self.set_msg('No shows found')
+                return
         else:
-            show_name = self.args['show'].lower()
-            channel_name = None
-            for channel in ep_ranges_map:
-                if self.args['show'] in ep_ranges_map[channel]:
-                    channel_name = channel
-
-            if channel_name is None:
-                self.set_msg(f'No show found for {show_name}')
+            show = index.show(self.args['show'])
+            if show is None:
+                self.set_msg(f'No show found for {self.args["show"]}')
                 return
 
-        ndx_lists = [
-            list(range(
-                ep_limits[0],
-                ep_limits[1] + 1
-            ))
-            for ep_limits in ep_ranges_map[channel_name][show_name]
-        ]
-        ndxs = [ndx for ndx_list in ndx_lists for ndx in ndx_list]
+            episode = show.random_episode()
 
         self.open_content(
-            self.channel_id_map()[channel_name],
-            random.choice(ndxs),
+            self.channel_id_map()[episode.channel],
+            episode.content_id,
             'episode'
         )
@@ -0,0 +1,181 @@
+"""
+This file contains the indexes of the content maps in roku/content/*, which are
+loaded once and reloaded whenever their files change.
+"""
+import threading
+
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Union
+
+from .episodes import EpisodeIndex
+from .name_index import NameIndex
+from smart_home_hub.utils.config import config_store
+from smart_home_hub.utils.env_consts import CONFIG_BASE_DIR, ROKU_CONTENT_STORE, ROKU_CONTENT_STORES
+
+CONTENT_ID_MAP_PATH = 'roku/content/content_id_map.json'
+EPISODE_RANGES_PATH = 'roku/content/random_episode_ranges.json'
+
+
+class ContentMatch(NamedTuple):
+    """
+    A piece of content found in the content ID map
+    """
+    service: str
+    name: str
+    content_id: Any
+
+
+class ContentIdIndex:
+    """
+    An index of content_id_map.json ({service: {content name: content ID}}),
+    by service and content name, and by content name alone (to find which
+    service has it)
+    """
+    def __init__(self, content_id_map: Dict[str, Dict[str, Any]]):
+        self._by_service = {
+            service.casefold(): NameIndex(
+                (name, ContentMatch(service, name, content_id))
+                for name, content_id in content_map.items()
+            )
+            for service, content_map in content_id_map.items()
+        }
+        self._by_name = NameIndex(
+            (name, ContentMatch(service, name, content_id))
+            for service, content_map in content_id_map.items()
+            for name, content_id in content_map.items()
+        )
+
+    def lookup(self, service, name) -> Optional[ContentMatch]:
+        """
+        Returns the content with the name (or unique name prefix) on the
+        service, or None if not found
+        """
+        service_index = self._by_service.get(service.casefold())
+        if service_index is None:
+            return None
+
+        return service_index.lookup(name)
+
+    def find(self, name) -> Optional[ContentMatch]:
+        """
+        Returns the content with the name (or unique name prefix) on any
+        service, or None if not found
+        """
+        return self._by_name.lookup(name)
+
+    def search(self, prefix, service=None) -> List[ContentMatch]:
+        """
+        Returns all content whose name starts with the prefix
+        """
+        if service is None:
+            return self._by_name.prefix(prefix)
+
+        service_index = self._by_service.get(service.casefold())
+        if service_index is None:
+            return []
+
+        return service_index.prefix(prefix)
+
+
+class WatchedContent:
+    """
+    Keeps the index built from a content file, rebuilding it whenever the
+    file's version in config_store changes
+    """
+    def __init__(self, path, build: Callable[[dict], Any]):
+        """
+        :param path: Filepath to the content file, relative to CONFIG_BASE_DIR
+        :param build: Function building the index from the file's contents
+        """
+        self.path = path
+        self.build = build
+
+        self._value = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        filepath = CONFIG_BASE_DIR + self.path
+
+        with self._lock:
+            try:
+                content, version = config_store.get(filepath)
+            except FileNotFoundError:
+                content, version = {}, config_store.version(filepath)
+
+            if self._value is None or version != self._version:
+                self._value = self.build(dict(content))
+                self._version = version
+
+            return self._value
+
+    def invalidate(self):
+        """
+        Drops the index, so the file is loaded again on next use
+        """
+        with self._lock:
+            self._value = None
+
+
+class ContentIndex:
+    """
+    The indexes of every content file used by the Roku content actions. With
+    the "sqlite" backend, both indexes are served by the ContentStore instead.
+    """
+    def __init__(self, backend=ROKU_CONTENT_STORE):
+        """
+        :param backend: Either "json" or "sqlite" (validated at startup, see
+                        env_consts.check_env())
+        """
+        self.backend = backend
+
+        self._content_ids = WatchedContent(CONTENT_ID_MAP_PATH, ContentIdIndex)
+        self._episodes = WatchedContent(EPISODE_RANGES_PATH, EpisodeIndex)
+
+        self._store = None
+        self._store_lock = threading.Lock()
+
+    def content_ids(self) -> Union[ContentIdIndex, 'ContentStore']:
+        if self._uses_store():
+            return self.store()
+
+        return self._content_ids.get()
+
+    def episodes(self) -> Union[EpisodeIndex, 'ContentStore']:
+        if self._uses_store():
+            return self.store()
+
+        return self._episodes.get()
+
+    def store(self) -> 'ContentStore':
+        """
+        Returns the SQLite content store, opening it on first use
+        """
+        # Imported here, since the store imports ContentMatch from this module
+        from .content_store import ContentStore
+
+        with self._store_lock:
+            if self._store is None:
+                self._store = ContentStore()
+
+            return self._store
+
+    def invalidate(self):
+        self._content_ids.invalidate()
+        self._episodes.invalidate()
+
+    def _uses_store(self) -> bool:
+        """
+        Helper method to check the backend is known (so a misspelt one is
+        never quietly served by the JSON indexes)
+        """
+        if self.backend not in ROKU_CONTENT_STORES:
+            raise ValueError(
+                f'Unknown content store backend "{self.backend}", must be one '
+                f'of {", ".join(ROKU_CONTENT_STORES)} (see SHH_ROKU_CONTENT_STORE)'
+            )
+
+        return self.backend == 'sqlite'
+
+
+# Shared by every Roku device in the process
+content_index = ContentIndex()
@@ -0,0 +1,256 @@
+"""
+This file contains an optional SQLite backed store for the content maps in
+roku/content/*, for catalogs too large to keep in memory. Lookups are served
+from indexed tables, so memory use does not grow with the size of the catalog.
+"""
+import random
+import sqlite3
+import threading
+
+from typing import Any, Dict, List, Optional
+
+from .content_index import ContentMatch
+from .episodes import RandomEpisode, ShowEpisodes
+from .name_index import fold_name
+from smart_home_hub.utils.env_consts import CONFIG_BASE_DIR
+from smart_home_hub.utils.utils import create_dirs_for
+
+CONTENT_DB_PATH = 'roku/content/content.db'
+
+# Max results returned by a search
+DEFAULT_SEARCH_LIMIT = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS content (
+    service TEXT NOT NULL,
+    name TEXT NOT NULL,
+    norm_name TEXT NOT NULL,
+    content_id TEXT NOT NULL,
+    PRIMARY KEY (service, norm_name)
+);
+CREATE INDEX IF NOT EXISTS content_norm_name ON content (norm_name);
+
+CREATE TABLE IF NOT EXISTS shows (
+    channel TEXT NOT NULL,
+    show TEXT NOT NULL,
+    norm_show TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    cum_end INTEGER NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS episode_ranges (
+    norm_show TEXT NOT NULL,
+    first INTEGER NOT NULL,
+    last INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS episode_ranges_show ON episode_ranges (norm_show);
+
+-- No longer used (dropped from databases made by older versions)
+DROP TABLE IF EXISTS content_fts;
+"""
+
+
+def prefix_bounds(prefix):
+    """
+    Returns the (inclusive, exclusive) bounds of the strings starting with
+    prefix, so a prefix search can use an index
+    """
+    return prefix, prefix + '\U0010ffff'
+
+
+class ContentStore:
+    """
+    The SQLite content store. Provides the same lookups as the in-memory
+    ContentIdIndex and EpisodeIndex, so it can be used in their place.
+    """
+    def __init__(self, path=CONTENT_DB_PATH):
+        """
+        :param path: Filepath to the database, relative to CONFIG_BASE_DIR
+        """
+        self.filepath = CONFIG_BASE_DIR + path
+        create_dirs_for(self.filepath)
+
+        # NOTE: Shared by the API & VUI threads, so access is serialized
+        self._conn = sqlite3.connect(self.filepath, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    # Content ID lookups (see ContentIdIndex)
+
+    def lookup(self, service, name) -> Optional[ContentMatch]:
+        """
+        Returns the content with the name on the service, or the only name
+        starting with it (the same matching as ContentIdIndex, so both
+        backends play the same title)
+        """
+        service = service.casefold()
+        norm_name = fold_name(name)
+
+        rows = self._query(
+            'SELECT service, name, content_id FROM content '
+            'WHERE service = ? AND norm_name = ?',
+            (service, norm_name)
+        )
+        if not rows:
+            rows = self._query(
+                'SELECT service, name, content_id FROM content '
+                'WHERE service = ? AND norm_name >= ? AND norm_name < ? LIMIT 2',
+                (service, *prefix_bounds(norm_name))
+            )
+
+        return self._match(rows[0]) if len(rows) == 1 else None
+
+    def find(self, name) -> Optional[ContentMatch]:
+        """
+        Returns the content with the name (or unique name prefix) on any
+        service
+        """
+        norm_name = fold_name(name)
+
+        rows = self._query(
+            'SELECT service, name, content_id FROM content WHERE norm_name = ? LIMIT 1',
+            (norm_name,)
+        )
+        if not rows:
+            rows = self._query(
+                'SELECT service, name, content_id FROM content '
+                'WHERE norm_name >= ? AND norm_name < ? LIMIT 2',
+                prefix_bounds(norm_name)
+            )
+
+        return self._match(rows[0]) if len(rows) == 1 else None
+
+    def search(self, prefix, service=None, limit=DEFAULT_SEARCH_LIMIT) -> List[ContentMatch]:
+        """
+        Returns content whose name starts with the prefix, in name order
+        """
+        sql = 'SELECT service, name, content_id FROM content WHERE norm_name >= ? AND norm_name < ?'
+        params = prefix_bounds(fold_name(prefix))
+
+        if service is not None:
+            sql += ' AND service = ?'
+            params += (service.casefold(),)
+
+        return [
+            self._match(row)
+            for row in self._query(sql + ' ORDER BY norm_name LIMIT ?', params + (limit,))
+        ]
+
+    # Episode lookups (see EpisodeIndex)
+
+    @property
+    def count(self) -> int:
+        rows = self._query('SELECT max(cum_end) FROM shows', ())
+        return rows[0][0] or 0
+
+    def show(self, name) -> Optional[ShowEpisodes]:
+        """
+        Returns the show with the name, or the only show whose name starts
+        with it
+        """
+        norm_show = fold_name(name)
+
+        rows = self._query(
+            'SELECT channel, show, norm_show FROM shows WHERE norm_show = ?',
+            (norm_show,)
+        )
+        if not rows:
+            rows = self._query(
+                'SELECT channel, show, norm_show FROM shows '
+                'WHERE norm_show >= ? AND norm_show < ? LIMIT 2',
+                prefix_bounds(norm_show)
+            )
+            if len(rows) != 1:
+                return None
+
+        channel, show, norm_show = rows[0]
+        ranges = self._query(
+            'SELECT first, last FROM episode_ranges WHERE norm_show = ? ORDER BY rowid',
+            (norm_show,)
+        )
+
+        return ShowEpisodes(channel, show, ranges)
+
+    def random_episode(self) -> Optional[RandomEpisode]:
+        """
+        Returns a random episode across all shows, uniformly by episode
+        """
+        count = self.count
+        if count == 0:
+            return None
+
+        ndx = random.randrange(count)
+        rows = self._query(
+            'SELECT show, cum_end - count FROM shows WHERE cum_end > ? '
+            'ORDER BY cum_end LIMIT 1',
+            (ndx,)
+        )
+        show_name, show_start = rows[0]
+        show = self.show(show_name)
+
+        return RandomEpisode(show.channel, show.show, show.episode(ndx - show_start))
+
+    # Importing
+
+    def import_maps(self, content_id_map: Dict[str, Dict[str, Any]],
+                    ep_ranges_map: Dict[str, Dict[str, List[List[int]]]]):
+        """
+        Replaces the store's contents with the given maps (as stored in
+        content_id_map.json and random_episode_ranges.json), in a single
+        transaction
+        """
+        content_rows = (
+            (service.casefold(), name, fold_name(name), str(content_id))
+            for service, content_map in content_id_map.items()
+            for name, content_id in content_map.items()
+        )
+
+        show_rows = []
+        range_rows = []
+        seen_shows = set()
+        cum_end = 0
+        for channel, show_map in ep_ranges_map.items():
+            for show, ranges in show_map.items():
+                norm_show = fold_name(show)
+                if norm_show in seen_shows:
+                    continue
+
+                show_episodes = ShowEpisodes(channel, show, ranges)
+                if show_episodes.count == 0:
+                    continue
+
+                seen_shows.add(norm_show)
+                cum_end += show_episodes.count
+                show_rows.append((channel, show, norm_show, show_episodes.count, cum_end))
+                range_rows.extend(
+                    (norm_show, first, last) for first, last in ranges if last >= first
+                )
+
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM content')
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO content VALUES (?, ?, ?, ?)', content_rows
+            )
+
+            self._conn.execute('DELETE FROM shows')
+            self._conn.execute('DELETE FROM episode_ranges')
+            self._conn.executemany(
+                'INSERT INTO shows VALUES (?, ?, ?, ?, ?)', show_rows
+            )
+            self._conn.executemany(
+                'INSERT INTO episode_ranges VALUES (?, ?, ?)', range_rows
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _query(self, sql, params) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _match(row) -> ContentMatch:
+        return ContentMatch(*row)
@@ -1,17 +1,29 @@
-import upnpclient
-
 from marshmallow import fields
 
 from smart_home_hub.device.base_device import DeviceAction
+from .ssdp import RokuRecord, roku_discovery
 
 
 def list_available_devices() -> list:
     """
     Method to return list of available device names on the network
     """
-    devices = upnpclient.discover()
+    return [d.friendly_name for d in roku_discovery.devices()]
 
-    return [d.friendly_name for d in devices]
+
+def discover_device(device_name) -> RokuRecord:
+    """
+    Method to return the discovered roku device of the given name
+    :param device_name: Name of device we are searching for
+    :return: The RokuRecord of the device (with its location & serial)
+    :raises: ValueError if no such device is found
+    """
+    roku_device = roku_discovery.find_by_name(device_name)
+
+    if roku_device is None:
+        raise ValueError(f'No device found for name {device_name}')
+
+    return roku_device
 
 
 def discover_ip(device_name) -> str:
@@ -22,17 +34,7 @@ def discover_ip(device_name) -> str:
     :return: An IP address string that can be used to send requests
     :raises: ValueError if no such device is found
     """
-    devices = upnpclient.discover()
-
-    roku_device = [
-        d for d in devices
-        if device_name.lower() == d.friendly_name.lower()
-    ]
-
-    if len(roku_device) == 0:
-        raise ValueError(f'No device found for name {device_name}')
-
-    return roku_device[0].location
+    return discover_device(device_name).location
 
 
 class SetIP(DeviceAction):
@@ -53,7 +55,9 @@ class SetIP(DeviceAction):
 
         if name is not None:
             try:
-                self.device.config['ip'] = discover_ip(name)
+                roku_device = discover_device(name)
+                self.device.config['ip'] = roku_device.location
+                self.device.config['serial'] = roku_device.serial
                 self.device.config.save()
                 return
             except ValueError:
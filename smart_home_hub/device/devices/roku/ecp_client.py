@@ -0,0 +1,227 @@
+"""
+This file contains the client used to send commands to a Roku through its
+External Control Protocol (ECP).
+"""
+import requests
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from typing import List, Optional
+from urllib.parse import quote
+
+from smart_home_hub.utils.config import Config
+from .ssdp import roku_discovery
+
+# Seconds to wait for a connection to the Roku, and then for its response
+ECP_CONNECT_TIMEOUT = 2
+ECP_READ_TIMEOUT = 5
+# Seconds between keypresses in a sequence (Rokus drop keys sent too quickly)
+DEFAULT_KEY_SPACING = 0.1
+# Max seconds spent finding a Roku's new address after a connection failure
+DEFAULT_RERESOLVE_BUDGET = 2.5
+
+
+def keypress_endpoint(event) -> str:
+    """
+    Helper method to return the endpoint for the corresponding keypress event
+    :param event: Name of the event (ex: powerOn/powerOff)
+    :return: A string of the URL to hit
+    """
+    return f'/keypress/{event}'
+
+
+def text_events(text) -> List[str]:
+    """
+    Returns the keypress events to type out the given text (ex: in a search
+    field), one Lit_ event per character
+    """
+    return [
+        f'Lit_{quote(char, safe="")}' for char in text
+    ]
+
+
+class ECPClient:
+    """
+    A client for a single Roku, which reuses keep-alive connections across
+    requests (and threads) instead of opening a new one for every command.
+
+    If the Roku cannot be reached (ex: its DHCP lease changed), the client
+    finds it again by its serial number, updates the config and retries once.
+    """
+    def __init__(self, config: Config, pool_size=4,
+                 timeout=(ECP_CONNECT_TIMEOUT, ECP_READ_TIMEOUT),
+                 key_spacing=DEFAULT_KEY_SPACING,
+                 reresolve_budget=DEFAULT_RERESOLVE_BUDGET):
+        """
+        :param config: The RokuConfig, whose 'ip' is the base URL of the Roku.
+                       This is read on every request, so updates are picked up.
+        :param pool_size: Max number of connections to keep open to the Roku
+        :param timeout: (connect, read) timeouts in seconds for each request
+        :param key_spacing: Default seconds between keypresses in a sequence
+        :param reresolve_budget: Max seconds to spend finding the Roku again
+                                 after a connection failure
+        """
+        self.config = config
+        self.timeout = timeout
+        self.key_spacing = key_spacing
+        self.reresolve_budget = reresolve_budget
+
+        self._reresolve_lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.session.mount('http://', HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size
+        ))
+
+    @property
+    def base_url(self) -> str:
+        return self.config['ip'].rstrip('/')
+
+    def url(self, endpoint, base_url=None) -> str:
+        if base_url is None:
+            base_url = self.base_url
+
+        return base_url + '/' + endpoint.lstrip('/')
+
+    def keypress(self, event) -> requests.Response:
+        """
+        Sends a keypress event (ex: Home, powerOn) to the Roku
+        """
+        return self.post(keypress_endpoint(event))
+
+    def keypress_sequence(self, events: List[str], spacing=None) -> List[requests.Response]:
+        """
+        Sends the keypress events back to back over the same connection. Each
+        keypress is scheduled relative to the start of the sequence, so the
+        time spent on each request is taken out of the spacing instead of
+        adding to it.
+        :param events: List of keypress events, in order
+        :param spacing: Seconds between keypresses (defaults to key_spacing)
+        :return: The response for each keypress
+        """
+        if spacing is None:
+            spacing = self.key_spacing
+
+        responses = []
+        start = time.monotonic()
+
+        for ndx, event in enumerate(events):
+            delay = start + ndx * spacing - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            responses.append(self.keypress(event))
+
+        return responses
+
+    def launch(self, app_id, **params) -> requests.Response:
+        """
+        Launches the app with the given ID, passing any params (ex: contentID,
+        mediaType) on to the app
+        """
+        return self.post(f'/launch/{app_id}', params=params)
+
+    def input(self, app_id, **params) -> requests.Response:
+        """
+        Deep links into the app with the given ID, which must already be
+        running (avoids relaunching it)
+        """
+        return self.post(f'/input/{app_id}', params=params)
+
+    def query(self, endpoint) -> requests.Response:
+        """
+        Sends a query (ex: /query/device-info) to the Roku
+        """
+        return self.get(endpoint)
+
+    def get(self, endpoint, **request_args) -> requests.Response:
+        return self.request('GET', endpoint, **request_args)
+
+    def post(self, endpoint, **request_args) -> requests.Response:
+        return self.request('POST', endpoint, **request_args)
+
+    def request(self, method, endpoint, **request_args) -> requests.Response:
+        """
+        Sends a request to the Roku over the pooled session
+        :param method: HTTP method to use
+        :param endpoint: Endpoint relative to the Roku's base URL
+        :param request_args: Any additional keyword args for requests
+        """
+        request_args.setdefault('timeout', self.timeout)
+        base_url = self.base_url
+
+        try:
+            return self.session.request(
+                method,
+                self.url(endpoint, base_url),
+                **request_args
+            )
+        except requests.ConnectionError:
+            # NOTE: Read timeouts are not retried, since the Roku may have
+            #       already acted on the command
+            deadline = time.monotonic() + self.reresolve_budget
+            new_base_url = self.reresolve(base_url, deadline)
+
+            if new_base_url is None:
+                raise
+
+        timeout = request_args['timeout']
+        connect_timeout, read_timeout = (
+            timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        )
+        request_args['timeout'] = (
+            max(min(connect_timeout, deadline - time.monotonic()), 0.1),
+            read_timeout
+        )
+
+        return self.session.request(
+            method,
+            self.url(endpoint, new_base_url),
+            **request_args
+        )
+
+    def reresolve(self, failed_base_url, deadline) -> Optional[str]:
+        """
+        Finds the Roku's current address by its serial number, saving it to
+        the config if it has changed
+        :param failed_base_url: The base URL the Roku could not be reached at
+        :param deadline: time.monotonic() by which to give up
+        :return: The new base URL, or None if the Roku could not be found
+                 somewhere new
+        """
+        serial = self.config.get('serial')
+        if serial is None:
+            return None
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not self._reresolve_lock.acquire(timeout=remaining):
+            return None
+
+        try:
+            # Another thread may have already found it while we waited
+            if self.base_url != failed_base_url:
+                return self.base_url
+
+            record = roku_discovery.find_by_serial(serial, refresh_on_miss=False)
+
+            if record is None or record.location.rstrip('/') == failed_base_url:
+                try:
+                    record = roku_discovery.resolve(serial, deadline)
+                except OSError:
+                    # Can't search the network, so keep the original error
+                    return None
+
+            if record is None or record.location.rstrip('/') == failed_base_url:
+                return None
+
+            self.config['ip'] = record.location
+            self.config.save()
+
+            return self.base_url
+        finally:
+            self._reresolve_lock.release()
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,114 @@
+"""
+This file contains an index of the episode ID ranges in
+random_episode_ranges.json, used to pick random episodes without building the
+full list of episode IDs.
+"""
+import random
+
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Dict, List, NamedTuple, Optional
+
+from .name_index import NameIndex
+
+
+class RandomEpisode(NamedTuple):
+    """
+    An episode picked from the index
+    """
+    channel: str
+    show: str
+    content_id: int
+
+
+class ShowEpisodes:
+    """
+    The episode ID ranges of a single show, with the cumulative episode count
+    at the end of each range so an episode can be found with a bisect
+    """
+    def __init__(self, channel, show, ranges: List[List[int]]):
+        """
+        :param channel: Name of the channel the show is on
+        :param show: Name of the show
+        :param ranges: List of inclusive [first, last] episode ID ranges
+        """
+        self.channel = channel
+        self.show = show
+
+        self.starts = []
+        counts = []
+        for first, last in ranges:
+            if last >= first:
+                self.starts.append(first)
+                counts.append(last - first + 1)
+
+        self.ends = list(accumulate(counts))
+
+    @property
+    def count(self) -> int:
+        return self.ends[-1] if self.ends else 0
+
+    def episode(self, ndx) -> int:
+        """
+        Returns the ID of the ndx-th episode (0 <= ndx < count) across all of
+        the show's ranges
+        """
+        range_ndx = bisect_right(self.ends, ndx)
+        offset = ndx - (self.ends[range_ndx - 1] if range_ndx else 0)
+
+        return self.starts[range_ndx] + offset
+
+    def random_episode(self) -> RandomEpisode:
+        return RandomEpisode(
+            self.channel,
+            self.show,
+            self.episode(random.randrange(self.count))
+        )
+
+
+class EpisodeIndex:
+    """
+    An index of every show's episode ranges. Random episodes are picked
+    uniformly by episode, either from a single show or across all shows.
+    """
+    def __init__(self, ep_ranges_map: Dict[str, Dict[str, List[List[int]]]]):
+        """
+        :param ep_ranges_map: Map of channel -> show -> episode ID ranges, as
+                              stored in random_episode_ranges.json
+        """
+        self.shows: Dict[str, ShowEpisodes] = {}
+        for channel, show_map in ep_ranges_map.items():
+            for show, ranges in show_map.items():
+                show_episodes = ShowEpisodes(channel, show, ranges)
+                if show_episodes.count > 0:
+                    self.shows.setdefault(show, show_episodes)
+
+        self._show_names = NameIndex(self.shows.items())
+        self._show_list = list(self.shows.values())
+        self._show_ends = list(accumulate(s.count for s in self._show_list))
+
+    @property
+    def count(self) -> int:
+        return self._show_ends[-1] if self._show_ends else 0
+
+    def show(self, name) -> Optional[ShowEpisodes]:
+        """
+        Returns the show with the name (case insensitive), or the only show
+        whose name starts with it
+        """
+        return self._show_names.lookup(name)
+
+    def random_episode(self) -> Optional[RandomEpisode]:
+        """
+        Returns a random episode across all shows (so shows with more episodes
+        are more likely), or None if there are no episodes
+        """
+        if self.count == 0:
+            return None
+
+        ndx = random.randrange(self.count)
+        show_ndx = bisect_right(self._show_ends, ndx)
+        show = self._show_list[show_ndx]
+        offset = ndx - (self._show_ends[show_ndx - 1] if show_ndx else 0)
+
+        return RandomEpisode(show.channel, show.show, show.episode(offset))
@@ -0,0 +1,343 @@
+"""
+This file contains the RokuFleetDevice, which controls several named Rokus
+(ex: one per room) and can send commands to one, a group, or all of them at
+once.
+"""
+import threading
+
+from concurrent.futures import wait
+from marshmallow import ValidationError, fields
+from typing import Dict, Union
+
+from .discover_ip import discover_device
+from .roku_device import RokuConfig, RokuDevice
+from smart_home_hub.device.base_device import DeviceAction
+from smart_home_hub.device.configurable_device import ConfigurableDevice
+from smart_home_hub.utils.config import Config, ConfigMap
+
+# Name used to target every member of the fleet
+ALL_MEMBERS = 'all'
+# Seconds to wait on each member for a broadcast command
+DEFAULT_BROADCAST_TIMEOUT = 5.0
+
+
+class RokuFleetConfig(Config):
+    """
+    Internal config for the fleet, containing the names of its members and
+    any groups of members, ex:
+    {
+      "members": ["living_room", "kitchen"],
+      "groups": {"downstairs": ["living_room", "kitchen"]}
+    }
+    """
+
+    def rel_filepath(self) -> str:
+        return 'roku/fleet.json'
+
+    @classmethod
+    def config_map(cls) -> Union[ConfigMap, dict]:
+        return {}
+
+
+class ListMembers(DeviceAction):
+    _name = 'list_members'
+    _desc = 'Lists the Rokus (and groups of Rokus) in the fleet'
+
+    def argmap(self) -> dict:
+        return {}
+
+    def perform(self):
+        # Copied, since the config's content is shared until it is saved
+        groups = dict(self.device.config.get('groups', {}))
+
+        self.resp['members'] = list(self.device.members.keys())
+        self.resp['groups'] = groups
+        self.set_msg(
+            f'Members: {", ".join(self.resp["members"])}. '
+            f'Groups: {", ".join(groups.keys())}'
+        )
+
+
+class AddMember(DeviceAction):
+    _name = 'add_member'
+    _desc = 'Adds the Roku with the given (discovered) name to the fleet'
+
+    def argmap(self) -> dict:
+        return {
+            'member': fields.Str(
+                required=True,
+                voice_ndx=0,
+                description='Name to refer to the Roku by in the fleet'
+            ),
+            'device_name': fields.Str(
+                required=True,
+                voice_ndx=1,
+                description='Name of the Roku on the network'
+            )
+        }
+
+    def perform(self):
+        member = self.args['member'].lower()
+        if member == ALL_MEMBERS or member in self.device.config.get('groups', {}):
+            self.set_msg(f'{member} is already used', exit_early=True)
+            return
+
+        try:
+            roku_device = discover_device(self.args['device_name'])
+        except ValueError as e:
+            self.set_msg(str(e), exit_early=True)
+            return
+
+        member_config = RokuConfig(member=member)
+        member_config['ip'] = roku_device.location
+        member_config['serial'] = roku_device.serial
+        member_config.save()
+
+        self.device.add_member(member)
+        self.set_msg(f'Added {member} to the fleet')
+
+
+class RemoveMember(DeviceAction):
+    _name = 'remove_member'
+    _desc = 'Removes the Roku from the fleet (and any groups)'
+
+    def argmap(self) -> dict:
+        return {
+            'member': fields.Str(
+                required=True,
+                voice_ndx=0
+            )
+        }
+
+    def perform(self):
+        member = self.args['member'].lower()
+
+        if member not in self.device.members:
+            self.set_msg(f'No member named {member}', exit_early=True)
+            return
+
+        self.device.remove_member(member)
+        self.set_msg(f'Removed {member} from the fleet')
+
+
+class SetGroup(DeviceAction):
+    _name = 'set_group'
+    _desc = 'Creates (or replaces) a named group of fleet members'
+
+    def argmap(self) -> dict:
+        return {
+            'group': fields.Str(
+                required=True
+            ),
+            'members': fields.List(
+                fields.Str(),
+                required=True,
+                description='Names of the members in the group (empty to delete it)'
+            )
+        }
+
+    def perform(self):
+        group = self.args['group'].lower()
+        members = [m.lower() for m in self.args['members']]
+
+        unknown = [m for m in members if m not in self.device.members]
+        if group == ALL_MEMBERS or group in self.device.members or unknown:
+            self.set_msg(
+                f'Invalid group {group} with unknown members: {", ".join(unknown)}',
+                exit_early=True
+            )
+            return
+
+        # Copied, since the config's content is shared until it is saved
+        groups = dict(self.device.config.get('groups', {}))
+        if members:
+            groups[group] = members
+        else:
+            groups.pop(group, None)
+
+        self.device.config['groups'] = groups
+        self.device.config.save()
+
+        self.set_msg(f'Group {group} has members: {", ".join(members)}')
+
+
+class Broadcast(DeviceAction):
+    _name = 'broadcast'
+    _desc = """
+        Performs a Roku action (ex: off, home, hdmi) on one member, a group, or
+        all of the fleet at once.
+    """
+
+    def argmap(self) -> dict:
+        return {
+            'action': fields.Str(
+                required=True,
+                voice_ndx=0
+            ),
+            'target': fields.Str(
+                missing=ALL_MEMBERS,
+                voice_ndx=1,
+                description='A member, group, or "all"'
+            ),
+            'args': fields.Dict(
+                missing={},
+                description='Arguments for the action'
+            ),
+            'timeout': fields.Float(
+                missing=DEFAULT_BROADCAST_TIMEOUT,
+                description='Seconds to wait on each member'
+            )
+        }
+
+    def perform(self):
+        # Imported here to avoid a circular import (smart_home_hub.device
+        # imports this module to build the device class map)
+        from smart_home_hub.device import action_executor
+
+        action_name = self.args['action'].lower()
+
+        try:
+            members = self.device.target_members(self.args['target'].lower())
+        except KeyError:
+            self.set_msg(f'No member or group named {self.args["target"]}', exit_early=True)
+            return
+
+        # Validating the args for every member before sending anything
+        actions = {}
+        for member_name, member in members.items():
+            try:
+                spec = member.action_spec(action_name)
+                action_args = spec.schema.load(self.args['args'])
+            except KeyError:
+                self.set_msg(f'No action named {action_name}', exit_early=True)
+                return
+            except ValidationError as e:
+                self.set_msg(f'Invalid args: {e.normalized_messages()}', exit_early=True)
+                return
+
+            actions[member_name] = member.action(action_name)
+            actions[member_name].init_args(**action_args)
+
+        # Members each have their own executor queue, so they run concurrently
+        futures = {
+            member_name: action_executor.submit(action)
+            for member_name, action in actions.items()
+        }
+        wait(futures.values(), timeout=self.args['timeout'])
+
+        results = {}
+        for member_name, future in futures.items():
+            if not future.done():
+                future.cancel()
+                results[member_name] = {'status': 'timeout'}
+            elif future.exception() is not None:
+                results[member_name] = {'status': 'failed', 'error': repr(future.exception())}
+            else:
+                response = future.result()
+                results[member_name] = {
+                    'status': 'failed' if response['status'] > 0 else 'done',
+                    'response': response
+                }
+
+        failed = [m for m, result in results.items() if result['status'] != 'done']
+
+        self.resp['results'] = results
+        self.set_msg(
+            f'Sent {action_name} to {len(results) - len(failed)} of {len(results)} devices'
+            + (f'. Failed: {", ".join(failed)}' if failed else ''),
+            exit_early=len(failed) > 0
+        )
+
+
+class RokuFleetDevice(ConfigurableDevice):
+    """
+    Represents a fleet of named Rokus, each of which is a RokuDevice with its
+    own config
+    """
+    _name = 'roku_fleet'
+    _desc = 'A way to interact with several named Rokus (ex: one per room) at once.'
+
+    _conf_class = RokuFleetConfig
+
+    _action_classes = ConfigurableDevice._action_classes + [
+        ListMembers,
+        AddMember,
+        RemoveMember,
+        SetGroup,
+        Broadcast
+    ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # NOTE: Mutated in place (never reassigned), so it is shared with any
+        #       views of this device
+        self.members: Dict[str, RokuDevice] = {}
+        self._members_lock = threading.Lock()
+
+        for member in self.config.get('members', []):
+            self.members[member] = RokuDevice(member=member)
+
+    def target_members(self, target) -> Dict[str, RokuDevice]:
+        """
+        Returns the members for a target (a member, group, or "all")
+        :raises: KeyError if no such member or group exists
+        """
+        if target == ALL_MEMBERS:
+            names = list(self.members.keys())
+        elif target in self.members:
+            names = [target]
+        else:
+            names = self.config.get('groups', {})[target]
+
+        return {
+            name: self.members[name] for name in names
+        }
+
+    def add_member(self, member):
+        """
+        Adds the member (whose RokuConfig must already be saved) to the fleet
+        """
+        with self._members_lock:
+            old_member = self.members.get(member)
+
+            new_member = RokuDevice(member=member)
+            new_member.start()
+            self.members[member] = new_member
+
+            self.config['members'] = list(self.members.keys())
+            self.config.save()
+
+        if old_member is not None:
+            old_member.shutdown()
+
+    def remove_member(self, member):
+        with self._members_lock:
+            old_member = self.members.pop(member)
+
+            self.config['members'] = list(self.members.keys())
+            self.config['groups'] = {
+                group: [m for m in members if m != member]
+                for group, members in self.config.get('groups', {}).items()
+            }
+            self.config.save()
+
+        old_member.shutdown()
+
+    def start(self):
+        super().start()
+
+        for member in list(self.members.values()):
+            member.start()
+
+    def refresh(self):
+        super().refresh()
+
+        for member in list(self.members.values()):
+            member.refresh()
+
+    def shutdown(self):
+        super().shutdown()
+
+        for member in list(self.members.values()):
+            member.shutdown()
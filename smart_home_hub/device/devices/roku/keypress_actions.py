@@ -2,21 +2,15 @@
 This file contains classes representing basic device actions for imitating
 useful keypresses on the roku remote (bc I am lazy)
 """
-import requests
-
 from abc import ABCMeta
 from marshmallow import fields, validate
 
 from smart_home_hub.device.base_device import DeviceAction
+from .ecp_client import text_events
+from .state import HOME_APP, POWER_ON_MODE
 
-
-def keypress_endpoint(event) -> str:
-    """
-    Helper method to return the endpoint for the corresponding keypress event
-    :param event: Name of the event (ex: powerOn/powerOff)
-    :return: A string of the URL to hit
-    """
-    return f'/keypress/{event}'
+# Max volume level of a Roku TV
+MAX_VOLUME = 100
 
 
 class KeyPressAction(DeviceAction, metaclass=ABCMeta):
@@ -24,7 +18,23 @@ class KeyPressAction(DeviceAction, metaclass=ABCMeta):
     Helper class to make the accessing of endpoints less hardcoded
     """
     def keypress(self, event):
-        requests.post(self.device.config['ip'] + keypress_endpoint(event))
+        self.device.ecp.keypress(event)
+
+    def keypress_sequence(self, events):
+        self.device.ecp.keypress_sequence(events)
+
+    def is_redundant(self, check) -> bool:
+        """
+        Returns whether the command should be skipped, if the device is set to
+        skip redundant commands
+        :param check: Function returning True if the command would not change
+                      the Roku's state
+        """
+        if self.device.skip_redundant and check():
+            self.set_msg('Nothing to change')
+            return True
+
+        return False
 
 
 class Volume(KeyPressAction):
@@ -39,18 +49,88 @@ class Volume(KeyPressAction):
             ),
             'units': fields.Int(
                 missing=1,
-                voice_ndx=1
+                voice_ndx=1,
+                validate=validate.Range(min=0, max=MAX_VOLUME)
+            )
+        }
+
+    def perform(self):
+        if self.args['direction'] == 'up':
+            event = 'volumeUp'
+        else:
+            event = 'volumeDown'
+
+        self.keypress_sequence([event] * self.args['units'])
+
+        volume = self.device.state.volume()
+        if volume is not None:
+            sign = 1 if self.args['direction'] == 'up' else -1
+            self.device.state.update(volume=min(
+                max(volume + sign * self.args['units'], 0),
+                MAX_VOLUME
+            ))
+
+
+class SetVolume(KeyPressAction):
+    _name = 'set_volume'
+    _desc = """
+        Sets the volume to the given level. If the current level is not given
+        (or known from a set_volume in the last 30s), the volume is first
+        turned all the way down, which takes ~10s plus 0.1s per level (and holds
+        up any other commands for the Roku until done).
+    """
+
+    def argmap(self) -> dict:
+        return {
+            'level': fields.Int(
+                required=True,
+                voice_ndx=0,
+                validate=validate.Range(min=0, max=MAX_VOLUME)
+            ),
+            'current': fields.Int(
+                missing=None,
+                validate=validate.Range(min=0, max=MAX_VOLUME),
+                description='The current volume level, if known'
             )
         }
 
     def perform(self):
-        for _ in range(self.args['units']):
-            if self.args['direction'] == 'up':
-                event = 'volumeUp'
-            else:
-                event = 'volumeDown'
+        level = self.args['level']
+        current = self.args.get('current')
+        if current is None:
+            current = self.device.state.volume()
+
+        if current is None:
+            # Resetting to a known level, since the Roku can't report it.
+            # NOTE: Sent at the usual key spacing, since a dropped press
+            #       would leave the volume above 0
+            self.keypress_sequence(['volumeDown'] * MAX_VOLUME)
+            current = 0
+
+        if level >= current:
+            events = ['volumeUp'] * (level - current)
+        else:
+            events = ['volumeDown'] * (current - level)
 
-            self.keypress(event)
+        self.keypress_sequence(events)
+        self.device.state.update(volume=level)
+        self.set_msg(f'Volume set to {level}')
+
+
+class TypeText(KeyPressAction):
+    _name = 'type'
+    _desc = 'Types the given text, ex: into a search field'
+
+    def argmap(self) -> dict:
+        return {
+            'text': fields.Str(
+                required=True,
+                voice_ndx=0
+            )
+        }
+
+    def perform(self):
+        self.keypress_sequence(text_events(self.args['text']))
 
 
 class Home(KeyPressAction):
@@ -61,6 +141,7 @@ class Home(KeyPressAction):
 
     def perform(self):
         self.keypress('Home')
+        self.device.state.update(active_app=HOME_APP)
 
 
 class PowerOn(KeyPressAction):
@@ -70,7 +151,11 @@ class PowerOn(KeyPressAction):
         return {}
 
     def perform(self):
+        if self.is_redundant(lambda: self.device.state.is_on() is True):
+            return
+
         self.keypress('powerOn')
+        self.device.state.update(power_mode=POWER_ON_MODE)
 
 
 class PowerOff(KeyPressAction):
@@ -80,7 +165,11 @@ class PowerOff(KeyPressAction):
         return {}
 
     def perform(self):
+        if self.is_redundant(lambda: self.device.state.is_on() is False):
+            return
+
         self.keypress('powerOff')
+        self.device.state.update(power_mode='DisplayOff')
 
 
 class Select(KeyPressAction):
@@ -105,6 +194,11 @@ class HDMI(KeyPressAction):
         }
 
     def perform(self):
+        app_id = f"tvinput.hdmi{self.args['input']}"
+        if self.is_redundant(lambda: self.device.state.active_app() == app_id):
+            return
+
         self.keypress(
             f"InputHDMI{self.args['input']}"
         )
+        self.device.state.update(active_app=app_id)
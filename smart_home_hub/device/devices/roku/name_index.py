@@ -0,0 +1,69 @@
+"""
+This file contains a case-insensitive index of names, supporting exact and
+prefix lookups (ex: for show names heard through the VUI).
+"""
+from bisect import bisect_left
+from typing import Any, Iterable, List, Optional, Tuple
+
+
+def fold_name(name) -> str:
+    """
+    Normalizes a name for lookups (case folded, with collapsed whitespace)
+    """
+    return ' '.join(str(name).casefold().split())
+
+
+class NameIndex:
+    """
+    A read-only index of names to values. Names are case folded, and kept
+    sorted so every name with a given prefix can be found with a bisect.
+    """
+    def __init__(self, items: Iterable[Tuple[str, Any]]):
+        """
+        :param items: (name, value) pairs. If several names fold to the same
+                      key, the first one is kept.
+        """
+        self._values = {}
+        for name, value in items:
+            self._values.setdefault(fold_name(name), value)
+
+        self._keys = sorted(self._values.keys())
+
+    def get(self, name, default=None):
+        return self._values.get(fold_name(name), default)
+
+    def prefix(self, prefix) -> List[Any]:
+        """
+        Returns the values of every name starting with the prefix, in name
+        order
+        """
+        prefix = fold_name(prefix)
+
+        values = []
+        ndx = bisect_left(self._keys, prefix)
+        while ndx < len(self._keys) and self._keys[ndx].startswith(prefix):
+            values.append(self._values[self._keys[ndx]])
+            ndx += 1
+
+        return values
+
+    def lookup(self, name) -> Optional[Any]:
+        """
+        Returns the value for the name, or for the only name it is a prefix
+        of, or None if there is no such name
+        """
+        value = self.get(name)
+        if value is not None:
+            return value
+
+        values = self.prefix(name)
+        if len(values) == 1:
+            return values[0]
+
+        return None
+
+    def __contains__(self, name):
+        return fold_name(name) in self._values
+
+    def __len__(self):
+        return len(self._values)
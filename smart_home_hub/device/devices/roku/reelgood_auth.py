@@ -0,0 +1,195 @@
+"""
+This file contains the token manager for Reelgood, which persists the access
+token and shares it between every RGClient in the process, so we only log in
+when the token is about to expire (or is rejected).
+"""
+import base64
+import json
+import threading
+import time
+import requests
+
+from typing import Callable, Dict, Optional, Union
+
+from smart_home_hub.utils.config import Config, ConfigMap
+
+# Seconds a token is assumed to be valid for, if its expiry can't be read
+DEFAULT_TOKEN_TTL = 12 * 60 * 60
+# Seconds before expiry at which the token is refreshed
+DEFAULT_REFRESH_MARGIN = 10 * 60
+# Seconds to wait before retrying a failed background refresh
+REFRESH_RETRY_INTERVAL = 60
+
+
+def token_expiry(access_token) -> Optional[float]:
+    """
+    Returns the expiry (as a timestamp) of a JWT access token from its "exp"
+    claim, or None if it can't be read
+    """
+    try:
+        payload = access_token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+
+        return float(json.loads(base64.urlsafe_b64decode(payload))['exp'])
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class RGTokenConfig(Config):
+    """
+    Internal config persisting the Reelgood access token, of the form
+    {"email": <account>, "access_token": <token>, "expires_at": <timestamp>}
+    """
+
+    def rel_filepath(self) -> str:
+        return 'roku/reelgood_token.json'
+
+    @classmethod
+    def config_map(cls) -> Union[ConfigMap, dict]:
+        return {
+            'email': None,
+            'access_token': None,
+            'expires_at': 0
+        }
+
+
+class RGTokenManager:
+    """
+    Keeps the access token for a Reelgood account. Logins are single-flight:
+    if several threads need a new token at once, only one logs in and the rest
+    wait for (and use) its token.
+    """
+    def __init__(self, email, login: Callable[[], str],
+                 refresh_margin=DEFAULT_REFRESH_MARGIN):
+        """
+        :param email: Email of the account, to check the persisted token is
+                      for the same account
+        :param login: Function logging in to Reelgood, returning a new token
+        :param refresh_margin: Seconds before expiry to refresh the token
+        """
+        self.email = email
+        self.login = login
+        self.refresh_margin = refresh_margin
+
+        self.config = RGTokenConfig()
+        if self.config['email'] != email:
+            self.config.init_default_content()
+
+        self._login_lock = threading.Lock()
+
+        self._refresh_thread = None
+        self._refresh_users = 0
+        self._refresh_lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    @property
+    def expires_at(self) -> float:
+        return self.config['expires_at']
+
+    def token(self) -> str:
+        """
+        Returns a valid access token, logging in first if there is none (or it
+        is about to expire)
+        """
+        access_token = self.config['access_token']
+        if access_token is not None and time.time() < self.expires_at - self.refresh_margin:
+            return access_token
+
+        return self.refresh(access_token)
+
+    def refresh(self, stale_token=None) -> str:
+        """
+        Logs in for a new token, unless another thread has already replaced
+        the stale one
+        :param stale_token: The token that was rejected (or is expiring)
+        """
+        with self._login_lock:
+            access_token = self.config['access_token']
+            if access_token is not None and access_token != stale_token:
+                return access_token
+
+            access_token = self.login()
+            expires_at = token_expiry(access_token)
+
+            self.config['email'] = self.email
+            self.config['access_token'] = access_token
+            self.config['expires_at'] = (
+                expires_at if expires_at is not None else time.time() + DEFAULT_TOKEN_TTL
+            )
+            self.config.save()
+
+            return access_token
+
+    def start_background_refresh(self):
+        """
+        Starts a daemon thread refreshing the token before it expires (does
+        nothing if one is already running). Each call must be matched by a
+        call to stop_background_refresh().
+        """
+        with self._refresh_lock:
+            self._refresh_users += 1
+            if self._refresh_thread is not None:
+                return
+
+            self._stop_event.clear()
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_loop,
+                name='shh-reelgood-token',
+                daemon=True
+            )
+            self._refresh_thread.start()
+
+    def stop_background_refresh(self):
+        """
+        Stops the background refresh, once every user that started it has
+        stopped it
+        """
+        with self._refresh_lock:
+            self._refresh_users = max(self._refresh_users - 1, 0)
+            if self._refresh_users > 0:
+                return
+
+            thread = self._refresh_thread
+            self._refresh_thread = None
+
+        if thread is not None:
+            self._stop_event.set()
+            thread.join(timeout=1)
+
+    def _refresh_loop(self):
+        while True:
+            delay = self.expires_at - self.refresh_margin - time.time()
+
+            if delay <= 0:
+                try:
+                    self.refresh(self.config['access_token'])
+                except requests.RequestException:
+                    # Reelgood unavailable, requests will log in if needed
+                    pass
+
+                delay = max(
+                    self.expires_at - self.refresh_margin - time.time(),
+                    REFRESH_RETRY_INTERVAL
+                )
+
+            if self._stop_event.wait(delay):
+                return
+
+
+_token_managers: Dict[str, RGTokenManager] = {}
+_token_managers_lock = threading.Lock()
+
+
+def shared_token_manager(email, login: Callable[[], str]) -> RGTokenManager:
+    """
+    Returns the token manager for the account, shared by every client in the
+    process. The manager logs in with the most recent client's login, so a
+    client rebuilt with new credentials (ex: a changed password) uses them.
+    """
+    with _token_managers_lock:
+        if email not in _token_managers:
+            _token_managers[email] = RGTokenManager(email, login)
+        else:
+            _token_managers[email].login = login
+
+        return _token_managers[email]
@@ -0,0 +1,257 @@
+"""
+This file contains the response cache for Reelgood, so repeated lookups of the
+same titles (ex: a family's favourite shows) never touch the network. Responses
+are kept in an in-memory LRU, backed by a SQLite table that survives restarts.
+"""
+import json
+import sqlite3
+import threading
+import time
+import requests
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, NamedTuple, Optional
+from urllib.parse import urlencode
+
+from smart_home_hub.utils.env_consts import CONFIG_BASE_DIR
+from smart_home_hub.utils.utils import create_dirs_for
+
+CACHE_DB_PATH = 'roku/reelgood_cache.db'
+
+# Seconds a response of each kind is fresh for, and then how many more seconds
+# it can still be served (while being revalidated in the background)
+SEARCH_KIND = 'search'
+CONTENT_KIND = 'content'
+DEFAULT_TTLS = {
+    # Search results rarely change
+    SEARCH_KIND: (7 * 24 * 60 * 60, 30 * 24 * 60 * 60),
+    # Availability (which services have a title) changes more often
+    CONTENT_KIND: (6 * 60 * 60, 24 * 60 * 60)
+}
+
+# Max responses kept in memory
+DEFAULT_MEMORY_ENTRIES = 256
+
+
+def cache_key(endpoint, params: Optional[dict] = None) -> str:
+    """
+    Returns the key of a request, ignoring the order and case of its params
+    (ex: the same title said with different capitalization)
+    """
+    params = sorted(
+        (str(key), ' '.join(str(val).casefold().split()))
+        for key, val in (params or {}).items()
+    )
+
+    return endpoint.rstrip('/') + '?' + urlencode(params)
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    fetched_at: float
+
+
+class ResponseCache:
+    """
+    A two tier (memory, then SQLite) TTL cache of API responses. Each kind of
+    response has its own TTL. Once an entry is stale (but not expired), it is
+    still returned while a fresh response is fetched in the background.
+    """
+    def __init__(self, path=CACHE_DB_PATH, ttls: Dict[str, tuple] = None,
+                 max_memory_entries=DEFAULT_MEMORY_ENTRIES):
+        """
+        :param path: Filepath to the database, relative to CONFIG_BASE_DIR
+        :param ttls: Map of kind to (fresh seconds, stale seconds)
+        :param max_memory_entries: Max responses kept in memory
+        """
+        self.filepath = CONFIG_BASE_DIR + path
+        self.ttls = ttls if ttls is not None else DEFAULT_TTLS
+        self.max_memory_entries = max_memory_entries
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.errors = 0
+
+        self._memory = OrderedDict()
+        self._revalidating = set()
+        self._lock = threading.Lock()
+
+        # Opened on first use, so importing doesn't touch the config dir
+        self._conn = None
+        self._db_lock = threading.Lock()
+        self._pool = None
+
+    def get(self, kind, key, fetch: Callable[[], Any]) -> Any:
+        """
+        Returns the cached response for the key, calling fetch() for it on a
+        miss (or in the background, if the entry is stale)
+        :param kind: Kind of response, which decides its TTL
+        :param key: Key of the request (see cache_key())
+        :param fetch: Function returning a fresh (JSON serializable) response
+        """
+        fresh_ttl, stale_ttl = self.ttls[kind]
+        entry = self._lookup(key)
+
+        if entry is not None:
+            age = time.time() - entry.fetched_at
+
+            if age < fresh_ttl:
+                with self._lock:
+                    self.hits += 1
+                return entry.value
+
+            if age < fresh_ttl + stale_ttl:
+                with self._lock:
+                    self.stale_hits += 1
+                self._revalidate(key, fetch)
+                return entry.value
+
+        with self._lock:
+            self.misses += 1
+
+        value = fetch()
+        self._store(key, value)
+
+        return value
+
+    def invalidate(self, key=None):
+        """
+        Drops the entry for the key (or every entry) from both tiers
+        """
+        with self._lock:
+            if key is None:
+                self._memory.clear()
+            else:
+                self._memory.pop(key, None)
+
+        with self._db_lock:
+            conn = self._connect()
+            with conn:
+                if key is None:
+                    conn.execute('DELETE FROM responses')
+                else:
+                    conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'revalidations': self.revalidations,
+                'errors': self.errors,
+                'memory_entries': len(self._memory)
+            }
+
+    def close(self):
+        with self._lock:
+            pool = self._pool
+            self._pool = None
+
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _lookup(self, key) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+
+        with self._db_lock:
+            row = self._connect().execute(
+                'SELECT value, fetched_at FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        entry = CacheEntry(json.loads(row[0]), row[1])
+        self._remember(key, entry)
+
+        return entry
+
+    def _store(self, key, value):
+        entry = CacheEntry(value, time.time())
+        self._remember(key, entry)
+
+        with self._db_lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO responses VALUES (?, ?, ?)',
+                    (key, json.dumps(value), entry.fetched_at)
+                )
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def _revalidate(self, key, fetch):
+        """
+        Helper method to fetch a fresh response in the background (once per
+        key at a time)
+        """
+        with self._lock:
+            if key in self._revalidating:
+                return
+
+            self._revalidating.add(key)
+            self.revalidations += 1
+
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=2,
+                    thread_name_prefix='shh-reelgood-cache'
+                )
+            pool = self._pool
+
+        def revalidate():
+            try:
+                self._store(key, fetch())
+            except (requests.RequestException, ValueError):
+                # Keep serving the stale entry, and try again on next use
+                with self._lock:
+                    self.errors += 1
+            finally:
+                with self._lock:
+                    self._revalidating.discard(key)
+
+        pool.submit(revalidate)
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Helper method to open the database (must hold self._db_lock), dropping
+        any expired entries
+        """
+        if self._conn is None:
+            create_dirs_for(self.filepath)
+
+            self._conn = sqlite3.connect(self.filepath, check_same_thread=False)
+            with self._conn:
+                self._conn.execute(
+                    'CREATE TABLE IF NOT EXISTS responses ('
+                    'key TEXT PRIMARY KEY, value TEXT NOT NULL, fetched_at REAL NOT NULL)'
+                )
+                self._conn.execute(
+                    'DELETE FROM responses WHERE fetched_at < ?',
+                    (time.time() - max(sum(ttl) for ttl in self.ttls.values()),)
+                )
+
+        return self._conn
+
+
+# Shared by every Reelgood client in the process
+rg_response_cache = ResponseCache()
@@ -1,13 +1,28 @@
 import json
 import requests
 
-TODO = """
-# For accessing a list of movies given Authorization
-URL = 'https://api.reelgood.com/v3.0/content/userlisting/movies?availability=all&hide_seen=true&hide_tracked=false&hide_watchlisted=false&imdb_end=10&imdb_start=0&region=us&rg_end=100&rg_start=0&skip=0&sort=0&take=50&year_end=2021&year_start=1900'
-URL = '/v3.0/content/userlisting/movies'
-# Shows
-URL = '	https://api.reelgood.com/v3.0/content/userlisting/shows/both?availability=all&genre=5&hide_seen=false&hide_tracked=false&hide_watchlisted=false&imdb_end=10&imdb_start=0&region=us&rg_end=100&rg_start=0&skip=0&sort=0&take=50&year_end=2021&year_start=1900'
-"""
+from .reelgood_auth import shared_token_manager
+from .reelgood_cache import CONTENT_KIND, SEARCH_KIND, cache_key, rg_response_cache
+from .reelgood_stream import parse_show_episode
+from .reelgood_transport import RGTransport
+from smart_home_hub.utils.utils import SingleFlight
+
+# Watchlist endpoints, which are paged through LISTING_PAGE_SIZE at a time
+USER_LISTING_ENDPOINTS = {
+    'm': '/content/userlisting/movies',
+    's': '/content/userlisting/shows/both'
+}
+USER_LISTING_PARAMS = {
+    'availability': 'all',
+    'hide_seen': 'false',
+    'hide_tracked': 'false',
+    'hide_watchlisted': 'false',
+    'region': 'us',
+    'sort': 0
+}
+LISTING_PAGE_SIZE = 50
+# Bytes read at a time from responses parsed as they are downloaded
+STREAM_CHUNK_SIZE = 64 * 1024
 
 BASE_API_URL = 'https://api.reelgood.com/v3.0'
 BASE_HEADERS = {
@@ -43,7 +58,6 @@ class RGClient:
                           without explicitly passing email and password
         """
         # TODO: Make this able to be used without an account
-        # TODO: Maybe add a cooldown for requests (have like a "time since last request")
         if cred_file is not None:
             with open(cred_file) as credential_file:
                 creds = json.load(credential_file)
@@ -58,8 +72,25 @@ class RGClient:
         else:
             raise ValueError('Must specify one of email & password, or cred_file')
 
-        self.access_token = None
-        self._refresh_access_token()
+        # Shared with every other client for the account, so we only log in
+        # when the (persisted) token is expiring or rejected
+        self.tokens = shared_token_manager(self.email, self._login)
+        self.cache = rg_response_cache
+        self.transport = rg_transport
+        self.flights = rg_flights
+
+    @property
+    def access_token(self) -> str:
+        return self.tokens.token()
+
+    def start(self):
+        """
+        Starts refreshing the access token in the background before it expires
+        """
+        self.tokens.start_background_refresh()
+
+    def close(self):
+        self.tokens.stop_background_refresh()
 
     def get_movie_viewing_id(self, rg_id):
         """
@@ -91,22 +122,28 @@ class RGClient:
                  }
         """
 
-        info = self.get_content_info('s', rg_id)
-
-        if info.get('recommended_episode'):
-            recommended_id = info['recommended_episode']['episode_id']
-        else:
-            min_seq_num = 1000
-            recommended_id = None
+        # The payload can include thousands of episodes, so it is parsed as it
+        # downloads and only the chosen episode's streaming ID's are kept.
+        # NOTE: Not cached, since the recommended (next) episode changes after
+        #       every watch
+        endpoint = f'/content/show/{rg_id}'
+        params = {
+            'interaction': 'true',
+            'region': 'us'
+        }
 
-            for ep in info['episodes'].values():
-                if ep['sequence_number'] < min_seq_num:
-                    min_seq_num = ep['sequence_number']
-                    recommended_id = ep['id']
+        def parse(chunks):
+            return parse_show_episode(
+                chunks,
+                lambda episode: self._get_streaming_id_map('episode', episode)
+            )
 
-        episode = info['episodes'][recommended_id]
+        streaming_map = self.flights.do(
+            cache_key(endpoint, params) + '#episode',
+            lambda: self._stream_request(parse, endpoint, params=params)
+        )
 
-        return self._get_streaming_id_map('episode', episode)
+        return streaming_map if streaming_map is not None else {}
 
     def get_content_info(self, content_type, rg_id):
         """
@@ -119,8 +156,8 @@ class RGClient:
         self._validate_content_type(content_type)
         content_type_str = 'show' if content_type == 's' else 'movie'
 
-        return self._make_request(
-            requests.get,
+        return self._cached_request(
+            CONTENT_KIND,
             f'/content/{content_type_str}/{rg_id}',
             params={
                 'interaction': 'true',
@@ -139,8 +176,8 @@ class RGClient:
         """
         self._validate_content_type(content_type)
 
-        results = self._make_request(
-            requests.get,
+        results = self._cached_request(
+            SEARCH_KIND,
             '/content/search/content',
             params={
                 'page': 1,
@@ -156,20 +193,101 @@ class RGClient:
             if content['content_type'] == content_type
         ]
 
+    def iter_user_listing(self, content_type):
+        """
+        Yields every movie or show on the account's watchlists, one page of
+        results at a time
+
+        :param content_type: Either show or movie ("s" | "m")
+        :return: A generator of the content dicts (with "id" & "title")
+        """
+        self._validate_content_type(content_type)
+        skip = 0
+
+        while True:
+            results = self._make_request(
+                'GET',
+                USER_LISTING_ENDPOINTS[content_type],
+                params={
+                    **USER_LISTING_PARAMS,
+                    'skip': skip,
+                    'take': LISTING_PAGE_SIZE
+                }
+            )
+            if isinstance(results, dict):
+                results = results.get('items', [])
+
+            yield from results
+
+            if len(results) < LISTING_PAGE_SIZE:
+                return
+            skip += LISTING_PAGE_SIZE
+
+    def _cached_request(self, kind, endpoint, params):
+        """
+        A helper method to make a GET request through the response cache. On a
+        miss, concurrent identical requests (from any client) share one
+        request to Reelgood.
+
+        :param kind: Kind of response (ex: search), which decides its TTL
+        :param endpoint: The relative endpoint path to make the request to
+        :param params: Query params of the request
+        :return: The JSON of the (possibly cached) response
+        """
+        key = cache_key(endpoint, params)
+
+        return self.cache.get(
+            kind,
+            key,
+            lambda: self.flights.do(
+                key,
+                lambda: self._make_request('GET', endpoint, params=params)
+            )
+        )
+
+    def _stream_request(self, parse, endpoint, **request_args):
+        """
+        A helper method to make an authorized GET request, parsing the
+        response as it is downloaded instead of loading it all at once
+
+        :param parse: Function parsing the chunks of the response body
+        :param endpoint: The relative endpoint path to make the request to
+        :param request_args: Any additional keyword args for the transport
+        :return: The result of parse
+        """
+        resp = self._request('GET', endpoint, stream=True, **request_args)
+
+        try:
+            return parse(resp.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+        finally:
+            resp.close()
+
     def _make_request(self, method, endpoint, **request_args):
         """
-        A helper method to make and return an authorized request to the API
+        A helper method to make an authorized request to the API
 
-        :param method: The requests method to use (requests.post, etc.)
+        :param method: The HTTP method to use (GET, POST, etc.)
         :param endpoint: The relative endpoint path to make the request to
-        :param request_args: Any additional keyword args to pass to `method`
+        :param request_args: Any additional keyword args for the transport
         :return: The JSON of the response
         """
-        def get_resp():
+        return self._request(method, endpoint, **request_args).json()
+
+    def _request(self, method, endpoint, **request_args) -> requests.Response:
+        """
+        A helper method to make and return an authorized request to the API,
+        logging in again (once) if the token is rejected
+
+        :param method: The HTTP method to use (GET, POST, etc.)
+        :param endpoint: The relative endpoint path to make the request to
+        :param request_args: Any additional keyword args for the transport
+        :return: The (successful) response
+        """
+        def get_resp(access_token):
+            # NOTE: BASE_HEADERS are sent by the transport's session
             headers = {
-                'Authorization': f'Bearer {self.access_token}',
-                'Host': 'api.reelgood.com',
-                **BASE_HEADERS
+                'Authorization': f'Bearer {access_token}',
+                'Host': 'api.reelgood.com'
             }
 
             # Copying in case we have to retry the request, so we don't lose
@@ -179,25 +297,27 @@ class RGClient:
             if 'headers' in request_args:
                 headers.update(new_args.pop('headers'))
 
-            return method(
+            return self.transport.request(
+                method,
                 BASE_API_URL + endpoint,
                 headers=headers,
                 **new_args
             )
 
-        resp = get_resp()
+        access_token = self.access_token
+        resp = get_resp(access_token)
         if resp.status_code == 401:
-            self._refresh_access_token()
-            resp = get_resp()
+            resp = get_resp(self.tokens.refresh(access_token))
 
         resp.raise_for_status()
-        return resp.json()
+        return resp
 
-    def _refresh_access_token(self):
+    def _login(self) -> str:
         """
-        Helper method to refresh the access token
+        Helper method to log in to Reelgood, returning a new access token
         """
-        resp = requests.post(
+        resp = self.transport.request(
+            'POST',
             'https://reelgood.com/login',
             json={
                 'email': self.email,
@@ -211,14 +331,12 @@ class RGClient:
             },
             headers={
                 'Host': 'reelgood.com',
-                'Referer': 'https://reelgood.com/login',
-                'Content-Length': '208',
-                **BASE_HEADERS
+                'Referer': 'https://reelgood.com/login'
             }
         )
         resp.raise_for_status()
 
-        self.access_token = resp.json()['access_token']
+        return resp.json()['access_token']
 
     @staticmethod
     def _validate_content_type(content_type):
@@ -251,3 +369,10 @@ class RGClient:
                 pass
 
         return streaming_map
+
+
+# Shared by every Reelgood client in the process, so connections are reused
+rg_transport = RGTransport(base_headers=BASE_HEADERS)
+# Shared by every Reelgood client in the process, so identical lookups made at
+# the same time (ex: from the API and the VUI) are only requested once
+rg_flights = SingleFlight()
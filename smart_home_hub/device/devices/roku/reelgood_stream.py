@@ -0,0 +1,268 @@
+"""
+This file contains an incremental parser for Reelgood show payloads, which can
+include every episode of a show. Only the fields needed to pick an episode are
+kept, so the full payload is never held as one dict tree (or even one string).
+"""
+import codecs
+import json
+import re
+
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+_decoder = json.JSONDecoder()
+WHITESPACE = ' \t\n\r'
+
+# A number is only complete once one of NUMBER_END follows it
+NUMBER_START = '-0123456789'
+NUMBER_END = ',}]' + WHITESPACE
+
+# Used to skip over values without decoding them
+STRUCTURAL_CHARS = re.compile(r'["{}\[\]]')
+STRING_REST = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"')
+
+
+class JSONStream:
+    """
+    A cursor over JSON text arriving in chunks. Values are decoded one at a
+    time, and text before the cursor is dropped as it is consumed.
+    """
+    def __init__(self, chunks: Iterable[bytes]):
+        """
+        :param chunks: The UTF-8 encoded JSON text, in chunks of any size
+        """
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    def peek(self) -> str:
+        """
+        Returns the next non-whitespace character (without consuming it), or
+        '' at the end of the text
+        """
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in WHITESPACE:
+                self._pos += 1
+
+            if self._pos < len(self._buf) or not self._read_more():
+                return self._buf[self._pos:self._pos + 1]
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f'Expected {char!r} at {self._pos}, found {self.peek()!r}')
+
+        self._pos += 1
+
+    def value(self):
+        """
+        Decodes the next JSON value. A number must be followed by a delimiter
+        (or the end of the text), so one cut off at the end of a chunk (ex:
+        "7." or "7.5e") is never decoded early.
+        """
+        is_number = self.peek() in NUMBER_START
+
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buf, self._pos)
+                if self._eof or (
+                    end < len(self._buf)
+                    and (not is_number or self._buf[end] in NUMBER_END)
+                ):
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+
+            self._read_more()
+
+    def skip(self):
+        """
+        Skips over the next JSON value without decoding it. Objects & arrays
+        are skipped by matching brackets (outside of strings), so none of
+        their contents are built.
+        """
+        if self.peek() not in '{[':
+            self.value()
+            return
+
+        depth = 0
+        ndx = self._pos
+
+        while True:
+            match = STRUCTURAL_CHARS.search(self._buf, ndx)
+            if match is None:
+                # Nothing in the rest of the buffer needs to be kept
+                self._pos = len(self._buf)
+                if not self._read_more():
+                    raise ValueError('Unexpected end of JSON while skipping a value')
+                ndx = self._pos
+                continue
+
+            if match.group() == '"':
+                string_end = STRING_REST.match(self._buf, match.end())
+                if string_end is None:
+                    # String cut off at the end of the buffer
+                    self._pos = match.start()
+                    if not self._read_more():
+                        raise ValueError('Unexpected end of JSON in a string')
+                    ndx = self._pos
+                    continue
+
+                ndx = string_end.end()
+                continue
+
+            depth += 1 if match.group() in '{[' else -1
+            ndx = match.end()
+
+            if depth == 0:
+                self._pos = ndx
+                return
+
+    def items(self) -> Iterator[str]:
+        """
+        Iterates through the keys of the object at the cursor. After each key
+        is yielded, the caller must consume its value (ex: with value()).
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+
+        while True:
+            key = self.value()
+            self.expect(':')
+            yield key
+
+            if self.peek() == ',':
+                self._pos += 1
+            else:
+                self.expect('}')
+                return
+
+    def elements(self) -> Iterator[int]:
+        """
+        Iterates through the array at the cursor, yielding the index of each
+        element. After each is yielded, the caller must consume its value.
+        """
+        self.expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+
+        ndx = 0
+        while True:
+            yield ndx
+            ndx += 1
+
+            if self.peek() == ',':
+                self._pos += 1
+            else:
+                self.expect(']')
+                return
+
+    def _read_more(self) -> bool:
+        """
+        Helper method to append the next chunk to the buffer (dropping the
+        consumed text), returning False at the end of the text
+        """
+        if self._eof:
+            return False
+
+        self._buf = self._buf[self._pos:]
+        self._pos = 0
+
+        try:
+            self._buf += self._utf8.decode(next(self._chunks))
+        except StopIteration:
+            self._buf += self._utf8.decode(b'', final=True)
+            self._eof = True
+
+        return True
+
+
+def parse_show_episode(chunks: Iterable[bytes],
+                       reduce: Callable[[dict], Any] = None) -> Optional[Any]:
+    """
+    Parses a /content/show/<id> payload, keeping only the episode to play:
+    the recommended episode if there is one, else the episode with the lowest
+    sequence number (same as RGClient.get_show_viewing_id used to pick).
+    Episodes are decoded one at a time, and any other large values are
+    skipped without being decoded.
+
+    NOTE: If the episodes come before the recommended episode, any of them
+    could be the one to play, so one reduced episode per episode is held until
+    the end of the payload (still far smaller than the decoded payload). They
+    are dropped as soon as the recommended episode is known.
+    :param chunks: The UTF-8 encoded payload, in chunks of any size
+    :param reduce: Function applied to each kept episode (a dict of its "id"
+                   and "availability") as soon as it is parsed, so only what
+                   it returns is held in memory
+    :return: The (reduced) episode, or None if the show has no episodes
+    """
+    if reduce is None:
+        reduce = lambda episode: episode
+
+    stream = JSONStream(chunks)
+
+    recommended_id = None
+    # (sequence number, id, reduced episode) of the lowest sequence number
+    first_episode = None
+    # Only needed if the episodes come before the recommended episode
+    reduced_by_id = {}
+
+    def parse_episode():
+        nonlocal first_episode
+
+        # Each episode is small, so it is decoded whole (which is much
+        # faster than walking its keys) and dropped once reduced
+        episode = stream.value()
+        if not isinstance(episode, dict) or 'id' not in episode:
+            return
+
+        ep_id = episode['id']
+        seq_num = episode.get('sequence_number')
+
+        is_first = seq_num is not None and (
+            first_episode is None or seq_num < first_episode[0]
+        )
+        is_candidate = recommended_id is None or ep_id == recommended_id
+        if not (is_first or is_candidate):
+            return
+
+        reduced = reduce({'id': ep_id, 'availability': episode.get('availability', [])})
+
+        if is_candidate:
+            reduced_by_id[ep_id] = reduced
+        if is_first:
+            first_episode = (seq_num, ep_id, reduced)
+
+    for key in stream.items():
+        if key == 'recommended_episode':
+            recommended = stream.value()
+            if recommended:
+                recommended_id = recommended.get('episode_id')
+                reduced_by_id = {
+                    ep_id: reduced for ep_id, reduced in reduced_by_id.items()
+                    if ep_id == recommended_id
+                }
+
+        elif key == 'episodes' and stream.peek() == '{':
+            for _ in stream.items():
+                parse_episode()
+
+        elif key == 'episodes' and stream.peek() == '[':
+            for _ in stream.elements():
+                parse_episode()
+
+        else:
+            stream.skip()
+
+    if recommended_id is not None and recommended_id in reduced_by_id:
+        return reduced_by_id[recommended_id]
+
+    if first_episode is None:
+        return None
+
+    return first_episode[2]
@@ -0,0 +1,231 @@
+"""
+This file contains the HTTP transport used for every Reelgood request, which
+reuses keep-alive (gzip compressed) connections, limits the request rate, and
+retries throttled or failed requests with jittered exponential backoff.
+"""
+import random
+import threading
+import time
+import requests
+
+from requests.adapters import HTTPAdapter
+from typing import Optional
+
+# Max sustained requests per second to Reelgood, and max burst above it
+DEFAULT_RATE = 5.0
+DEFAULT_BURST = 10
+# Max retries of a throttled (429) or failed (5xx) request
+DEFAULT_MAX_RETRIES = 3
+# Seconds of backoff before the first retry (doubled for each retry), and the
+# most we will ever back off for
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+# (connect, read) timeouts in seconds for each attempt
+DEFAULT_TIMEOUT = (3.05, 10)
+# Max seconds spent on a request, across all attempts (and waits)
+DEFAULT_DEADLINE = 20.0
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Methods retried after a connection error (the request may not have been
+# received, so only if sending it again is harmless)
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+
+class DeadlineExceeded(requests.Timeout):
+    """
+    Raised when a request can't be made (or retried) before its deadline
+    """
+
+
+class TokenBucket:
+    """
+    A token bucket rate limiter, allowing bursts of up to `burst` requests
+    while keeping to `rate` requests per second on average
+    """
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline=None) -> float:
+        """
+        Takes a token, waiting for one if the bucket is empty
+        :param deadline: time.monotonic() by which to give up
+        :return: Seconds spent waiting
+        :raises: DeadlineExceeded if no token is available before the deadline
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+
+            # Reserving the token now, so waiting threads are served in order
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+
+            if deadline is not None and now + wait > deadline:
+                self._tokens += 1
+                raise DeadlineExceeded('Rate limited past the request deadline')
+
+        if wait > 0:
+            time.sleep(wait)
+
+        return wait
+
+
+def backoff_delay(attempt, retry_after=None) -> float:
+    """
+    Returns the seconds to wait before a retry: the server's Retry-After if
+    given, else exponential backoff with full jitter
+    :param attempt: Number of the retry (starting at 0)
+    :param retry_after: Value of the Retry-After header, if any
+    """
+    if retry_after is not None:
+        try:
+            return min(float(retry_after), BACKOFF_MAX)
+        except ValueError:
+            # An HTTP date, which Reelgood doesn't send
+            pass
+
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+class RGTransport:
+    """
+    A keep-alive session for Reelgood, shared by every RGClient in the process
+    """
+    def __init__(self, base_headers: dict = None, pool_size=4,
+                 rate=DEFAULT_RATE, burst=DEFAULT_BURST,
+                 max_retries=DEFAULT_MAX_RETRIES, timeout=DEFAULT_TIMEOUT,
+                 deadline=DEFAULT_DEADLINE):
+        """
+        :param base_headers: Headers sent with every request
+        :param pool_size: Max number of connections to keep open per host
+        :param rate: Max sustained requests per second
+        :param burst: Max requests in a burst
+        :param max_retries: Max retries of a throttled or failed request
+        :param timeout: (connect, read) timeouts in seconds for each attempt
+        :param deadline: Default max seconds spent on a request
+        """
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.deadline = deadline
+        self.bucket = TokenBucket(rate, burst)
+
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.throttle_wait = 0.0
+        self._metrics_lock = threading.Lock()
+
+        self.adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session = requests.Session()
+        self.session.mount('https://', self.adapter)
+        self.session.headers.update(base_headers or {})
+
+    def request(self, method, url, deadline: Optional[float] = None,
+                **request_args) -> requests.Response:
+        """
+        Sends a request, retrying throttled (429) and failed (5xx) responses
+        :param method: HTTP method to use
+        :param url: Full URL to request
+        :param deadline: Max seconds to spend on the request (defaults to
+                         self.deadline)
+        :param request_args: Any additional keyword args for requests
+        :return: The last response (which may still be an error)
+        :raises: DeadlineExceeded if rate limiting would pass the deadline
+        """
+        method = method.upper()
+        give_up_at = time.monotonic() + (deadline if deadline is not None else self.deadline)
+        timeout = request_args.pop('timeout', self.timeout)
+        connect_timeout, read_timeout = (
+            timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        )
+
+        attempt = 0
+        while True:
+            waited = self.bucket.acquire(give_up_at)
+            remaining = give_up_at - time.monotonic()
+
+            with self._metrics_lock:
+                self.requests += 1
+                self.throttle_wait += waited
+
+            try:
+                resp = self.session.request(
+                    method,
+                    url,
+                    timeout=(
+                        max(min(connect_timeout, remaining), 0.01),
+                        max(min(read_timeout, remaining), 0.01)
+                    ),
+                    **request_args
+                )
+            except requests.ConnectionError:
+                if method not in IDEMPOTENT_METHODS or not self._backoff(attempt, give_up_at):
+                    self._count_error()
+                    raise
+
+                attempt += 1
+                continue
+
+            if resp.status_code not in RETRY_STATUSES or not self._backoff(
+                attempt, give_up_at, resp.headers.get('Retry-After')
+            ):
+                if resp.status_code >= 400:
+                    self._count_error()
+                return resp
+
+            resp.close()
+            attempt += 1
+
+    def metrics(self) -> dict:
+        """
+        Returns the request counts, along with how many connections have been
+        opened compared to requests sent over them (the rest reused one)
+        """
+        connections = 0
+        pool_requests = 0
+
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+                pool_requests += pool.num_requests
+
+        with self._metrics_lock:
+            return {
+                'requests': self.requests,
+                'retries': self.retries,
+                'errors': self.errors,
+                'throttle_wait_seconds': round(self.throttle_wait, 3),
+                'connections_opened': connections,
+                'connections_reused': max(pool_requests - connections, 0)
+            }
+
+    def close(self):
+        self.session.close()
+
+    def _backoff(self, attempt, give_up_at, retry_after=None) -> bool:
+        """
+        Helper method to wait before a retry
+        :return: False (without waiting) if there are no retries left, or
+                 the wait would pass the deadline
+        """
+        delay = backoff_delay(attempt, retry_after)
+        if attempt >= self.max_retries or time.monotonic() + delay >= give_up_at:
+            return False
+
+        with self._metrics_lock:
+            self.retries += 1
+
+        time.sleep(delay)
+        return True
+
+    def _count_error(self):
+        with self._metrics_lock:
+            self.errors += 1
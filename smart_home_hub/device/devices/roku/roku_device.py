@@ -1,15 +1,23 @@
 import os
 
-from typing import List, Union
+from typing import Union
 
-from .keypress_actions import Volume, Home, PowerOn, PowerOff, HDMI, Select
+from .keypress_actions import (
+    Volume, SetVolume, TypeText, Home, PowerOn, PowerOff, HDMI, Select
+)
 from .discover_ip import SetIP
+from .channels import ChannelIndex
+from .content_index import content_index
 from .content_actions import PlayRandom, PlayContent, PlayMovie, PlayShow
+from .ecp_client import ECPClient
+from .ssdp import roku_discovery
+from .state import RokuState
 from .reelgood_client import RGClient
-from smart_home_hub.device.base_device import DeviceAction
+from .title_index import rg_title_index
 from smart_home_hub.device.configurable_device import ConfigurableDevice
 from smart_home_hub.device.context_device import ContextDevice
 from smart_home_hub.utils.config import Config, ConfigMap
+from smart_home_hub.utils.env_consts import ROKU_SKIP_REDUNDANT
 
 RG_EMAIL_ENV = 'SHH_RG_EMAIL'
 RG_PASSWORD_ENV = 'SHH_RG_PASS'
@@ -21,8 +29,18 @@ class RokuConfig(Config):
     request
     """
 
+    def __init__(self, member=None):
+        """
+        :param member: Name of the Roku in the fleet, or None for the main Roku
+        """
+        self.member = member
+        super().__init__()
+
     def rel_filepath(self) -> str:
-        return 'roku/main_config.json'
+        if self.member is None:
+            return 'roku/main_config.json'
+
+        return f'roku/fleet/{self.member}.json'
 
     @classmethod
     def config_map(cls) -> Union[ConfigMap, dict]:
@@ -38,35 +56,94 @@ class RokuDevice(ContextDevice, ConfigurableDevice):
 
     _conf_class = RokuConfig
 
-    def __init__(self, *args, **kwargs):
+    _action_classes = ConfigurableDevice._action_classes + [
+        SetIP,
+        Volume,
+        SetVolume,
+        Home,
+        PowerOn,
+        PowerOff,
+        HDMI,
+        Select,
+        TypeText,
+        PlayRandom,
+        PlayContent,
+        # Only available with a Reelgood client
+        PlayMovie,
+        PlayShow
+    ]
+
+    def __init__(self, *args, member=None, **kwargs):
+        """
+        :param member: Name of the Roku in the fleet, or None for the main Roku
+        """
+        self.member = member
         super().__init__(*args, **kwargs)
 
+        # Shared by every view of this device, so connections are reused
+        self.ecp = ECPClient(self.config)
+        self.state = RokuState(self.ecp)
+        self.channels = ChannelIndex(self.ecp, member=self.member)
+        # Whether actions should skip commands that would not change anything
+        self.skip_redundant = ROKU_SKIP_REDUNDANT
+        self.rg_client = self._build_rg_client()
+
+    def build_config(self) -> RokuConfig:
+        return RokuConfig(member=self.member)
+
+    def executor_key(self) -> str:
+        if self.member is None:
+            return self.name
+
+        return f'{self.name}/{self.member}'
+
+    def start(self):
+        super().start()
+
+        # Keeping the discovered devices fresh, so set_device_ip is instant
+        roku_discovery.start_background_refresh()
+        if self.rg_client is not None:
+            self.rg_client.start()
+            rg_title_index.start_background_sync(self.rg_client)
+
+    def refresh(self):
+        super().refresh()
+
+        self.state.invalidate()
+        self.channels.invalidate()
+        content_index.invalidate()
+
+        # Stopping the old client's background work first, so nothing keeps
+        # using it once it is replaced
+        if self.rg_client is not None:
+            rg_title_index.stop_background_sync()
+            self.rg_client.close()
+
+        self.rg_client = self._build_rg_client()
+        if self.rg_client is not None:
+            self.rg_client.start()
+            rg_title_index.start_background_sync(self.rg_client)
+
+    def shutdown(self):
+        super().shutdown()
+
+        roku_discovery.stop_background_refresh()
+        if self.rg_client is not None:
+            rg_title_index.stop_background_sync()
+            self.rg_client.close()
+        self.ecp.close()
+
+    @staticmethod
+    def _build_rg_client():
+        """
+        Helper method to build the Reelgood client, or None if no credentials
+        are set
+        """
         try:
-            self.rg_client = RGClient(
+            return RGClient(
                 email=os.environ[RG_EMAIL_ENV],
                 password=os.environ[RG_PASSWORD_ENV]
             )
         except KeyError:
             # We will not include RG related functionality
-            self.rg_client = None
-
-    def actions(self) -> List[DeviceAction]:
-        _actions = super().actions() + [
-            SetIP(self),
-            Volume(self),
-            Home(self),
-            PowerOn(self),
-            PowerOff(self),
-            HDMI(self),
-            Select(self),
-            PlayRandom(self),
-            PlayContent(self)
-        ]
-
-        if self.rg_client is not None:
-            _actions += [
-                PlayMovie(self),
-                PlayShow(self)
-            ]
-
-        return _actions
+            return None
@@ -0,0 +1,352 @@
+"""
+This file contains a lightweight SSDP discovery for Rokus on the network, and
+a cache of the devices found so that lookups do not need a network search.
+"""
+import re
+import socket
+import threading
+import time
+import requests
+import xml.etree.ElementTree as ET
+
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+SSDP_ADDR = ('239.255.255.250', 1900)
+ROKU_SEARCH_TARGET = 'roku:ecp'
+ROKU_USN_PREFIX = 'uuid:roku:ecp:'
+
+# Seconds to wait for responses to an M-SEARCH
+DEFAULT_SEARCH_TIMEOUT = 2.0
+# Seconds a discovered device is trusted for, if it doesn't give a max-age
+DEFAULT_DEVICE_TTL = 30 * 60
+# Seconds between background refreshes of the cache
+DEFAULT_REFRESH_INTERVAL = 5 * 60
+# Seconds to wait for a Roku's device info
+DEVICE_INFO_TIMEOUT = 2.0
+
+
+class RokuRecord(NamedTuple):
+    """
+    A Roku found on the network
+    """
+    serial: str
+    location: str
+    friendly_name: str
+    expires_at: float
+
+
+def parse_ssdp_response(data: bytes) -> Dict[str, str]:
+    """
+    Parses the headers of an SSDP response into a dict (with lowercased keys)
+    """
+    headers = {}
+
+    for line in data.decode('utf-8', errors='replace').split('\r\n')[1:]:
+        if ':' in line:
+            key, val = line.split(':', 1)
+            headers[key.strip().lower()] = val.strip()
+
+    return headers
+
+
+def ssdp_search(search_target=ROKU_SEARCH_TARGET,
+                timeout=DEFAULT_SEARCH_TIMEOUT,
+                until: Callable[[Dict[str, str]], bool] = None) -> List[Dict[str, str]]:
+    """
+    Sends an SSDP M-SEARCH, and returns the headers of every response received
+    before the timeout
+    :param search_target: The ST to search for (only matching devices respond)
+    :param timeout: Seconds to wait for responses
+    :param until: Function returning True for the response being searched
+                  for, to return as soon as it is received
+    """
+    message = '\r\n'.join([
+        'M-SEARCH * HTTP/1.1',
+        'HOST: {}:{}'.format(*SSDP_ADDR),
+        'MAN: "ssdp:discover"',
+        f'ST: {search_target}',
+        f'MX: {max(int(timeout), 1)}',
+        '',
+        ''
+    ]).encode('utf-8')
+
+    responses = []
+    deadline = time.monotonic() + timeout
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP) as sock:
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 2)
+        sock.sendto(message, SSDP_ADDR)
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            sock.settimeout(remaining)
+            try:
+                data, _ = sock.recvfrom(65507)
+            except socket.timeout:
+                break
+
+            headers = parse_ssdp_response(data)
+            responses.append(headers)
+
+            if until is not None and until(headers):
+                break
+
+    return responses
+
+
+def fetch_friendly_name(location) -> Optional[str]:
+    """
+    Retrieves the name of the Roku at the given location from its ECP device
+    info (the only part of discovery not included in the SSDP headers)
+    """
+    try:
+        resp = requests.get(
+            location.rstrip('/') + '/query/device-info',
+            timeout=DEVICE_INFO_TIMEOUT
+        )
+        resp.raise_for_status()
+        info = ET.fromstring(resp.content)
+    except (requests.RequestException, ET.ParseError):
+        return None
+
+    for tag in ['friendly-device-name', 'user-device-name', 'default-device-name']:
+        name = info.findtext(tag)
+        if name:
+            return name
+
+    return None
+
+
+class DiscoveryCache:
+    """
+    A table of the Rokus on the network, keyed by serial number and friendly
+    name. Entries expire after their TTL, and the table can be kept fresh by a
+    background thread so lookups never have to wait on a search.
+    """
+    def __init__(self, ttl=DEFAULT_DEVICE_TTL,
+                 search_timeout=DEFAULT_SEARCH_TIMEOUT,
+                 refresh_interval=DEFAULT_REFRESH_INTERVAL):
+        """
+        :param ttl: Default seconds to keep a device for, if it doesn't
+                    specify a max-age
+        :param search_timeout: Seconds to wait for responses to each search
+        :param refresh_interval: Seconds between background refreshes
+        """
+        self.ttl = ttl
+        self.search_timeout = search_timeout
+        self.refresh_interval = refresh_interval
+
+        self._by_serial = {}
+        self._lock = threading.Lock()
+        self._search_lock = threading.Lock()
+        self._last_search = 0
+
+        self._refresh_thread = None
+        self._refresh_users = 0
+        self._stop_event = threading.Event()
+
+    def refresh(self, timeout=None) -> List[RokuRecord]:
+        """
+        Searches the network, updating the table with any Rokus found
+        :param timeout: Seconds to wait for responses (defaults to
+                        search_timeout)
+        :return: All (unexpired) Rokus in the table
+        """
+        if timeout is None:
+            timeout = self.search_timeout
+
+        with self._search_lock:
+            responses = ssdp_search(timeout=timeout)
+            now = time.time()
+
+            for headers in responses:
+                record = self._record_from(headers, now)
+                if record is not None:
+                    with self._lock:
+                        self._by_serial[record.serial] = record
+
+            self._last_search = now
+
+        return self.devices(refresh_if_empty=False)
+
+    def resolve(self, serial, deadline) -> Optional[RokuRecord]:
+        """
+        Searches the network for the Roku with the given serial number only,
+        returning as soon as it responds. Its friendly name is kept from the
+        table (not fetched), so the whole search is bounded by the deadline.
+        :param serial: Serial number of the Roku
+        :param deadline: time.monotonic() by which to give up
+        :return: The Roku's record, or None if it didn't respond in time
+        """
+        usn = ROKU_USN_PREFIX + serial
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not self._search_lock.acquire(timeout=remaining):
+            return None
+
+        try:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+
+            responses = ssdp_search(
+                timeout=remaining,
+                until=lambda headers: headers.get('usn') == usn
+            )
+        finally:
+            self._search_lock.release()
+
+        for headers in responses:
+            if headers.get('usn') == usn:
+                record = self._record_from(headers, time.time(), fetch_name=False)
+                if record is not None:
+                    with self._lock:
+                        self._by_serial[record.serial] = record
+
+                return record
+
+        return None
+
+    def devices(self, refresh_if_empty=True) -> List[RokuRecord]:
+        """
+        Returns all (unexpired) Rokus in the table
+        :param refresh_if_empty: Whether to search the network first if the
+                                 table has never been populated
+        """
+        if refresh_if_empty and self._last_search == 0:
+            return self.refresh()
+
+        now = time.time()
+
+        with self._lock:
+            for serial in [
+                serial for serial, record in self._by_serial.items()
+                if record.expires_at < now
+            ]:
+                del self._by_serial[serial]
+
+            return list(self._by_serial.values())
+
+    def find_by_name(self, name, refresh_on_miss=True) -> Optional[RokuRecord]:
+        """
+        Returns the Roku with the given friendly name (case insensitive)
+        :param refresh_on_miss: Whether to search the network if not found
+        """
+        return self._find(
+            lambda record: record.friendly_name.lower() == name.lower(),
+            refresh_on_miss
+        )
+
+    def find_by_serial(self, serial, refresh_on_miss=True) -> Optional[RokuRecord]:
+        """
+        Returns the Roku with the given serial number
+        :param refresh_on_miss: Whether to search the network if not found
+        """
+        return self._find(
+            lambda record: record.serial == serial,
+            refresh_on_miss
+        )
+
+    def start_background_refresh(self):
+        """
+        Starts a daemon thread refreshing the table every refresh_interval
+        (does nothing if one is already running). Each call must be matched
+        by a call to stop_background_refresh().
+        """
+        with self._lock:
+            self._refresh_users += 1
+            if self._refresh_thread is not None:
+                return
+
+            self._stop_event.clear()
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_loop,
+                name='shh-roku-discovery',
+                daemon=True
+            )
+            self._refresh_thread.start()
+
+    def stop_background_refresh(self):
+        """
+        Stops the background refresh, once every user that started it has
+        stopped it
+        """
+        with self._lock:
+            self._refresh_users = max(self._refresh_users - 1, 0)
+            if self._refresh_users > 0:
+                return
+
+            thread = self._refresh_thread
+            self._refresh_thread = None
+
+        if thread is not None:
+            self._stop_event.set()
+            thread.join(timeout=self.search_timeout + 1)
+
+    def _find(self, matches, refresh_on_miss) -> Optional[RokuRecord]:
+        for record in self.devices():
+            if matches(record):
+                return record
+
+        if refresh_on_miss:
+            for record in self.refresh():
+                if matches(record):
+                    return record
+
+        return None
+
+    def _record_from(self, headers, now, fetch_name=True) -> Optional[RokuRecord]:
+        """
+        Helper method to build the record for an SSDP response. Only fetches
+        the device info if the serial or location is new to the table (or
+        its name could not be fetched before).
+        :param fetch_name: Whether to fetch the device info at all, else the
+                           known name (or the serial) is used
+        """
+        usn = headers.get('usn', '')
+        location = headers.get('location')
+        if not usn.startswith(ROKU_USN_PREFIX) or location is None:
+            return None
+
+        serial = usn[len(ROKU_USN_PREFIX):]
+
+        max_age = re.search(r'max-age\s*=\s*(\d+)', headers.get('cache-control', ''))
+        ttl = int(max_age.group(1)) if max_age else self.ttl
+
+        with self._lock:
+            known = self._by_serial.get(serial)
+
+        has_name = known is not None and known.friendly_name != serial
+
+        if has_name and (known.location == location or not fetch_name):
+            friendly_name = known.friendly_name
+        elif fetch_name:
+            friendly_name = fetch_friendly_name(location) or serial
+        else:
+            # Fetched on the next full refresh
+            friendly_name = serial
+
+        return RokuRecord(
+            serial=serial,
+            location=location,
+            friendly_name=friendly_name,
+            expires_at=now + ttl
+        )
+
+    def _refresh_loop(self):
+        while True:
+            try:
+                self.refresh()
+            except OSError:
+                # Network unavailable, we will try again next interval
+                pass
+
+            if self._stop_event.wait(self.refresh_interval):
+                return
+
+
+# Shared by every Roku device in the process
+roku_discovery = DiscoveryCache()
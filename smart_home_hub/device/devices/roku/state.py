@@ -0,0 +1,159 @@
+"""
+This file contains a cache of a Roku's state (power, active app, volume), used
+to skip commands that would not change anything.
+"""
+import threading
+import time
+import requests
+import xml.etree.ElementTree as ET
+
+from typing import Callable, Optional
+
+from .ecp_client import ECPClient
+
+# Seconds a queried value is trusted for before querying the Roku again
+DEFAULT_STATE_TTL = 10.0
+# Seconds the volume we last set is trusted for, since it can't be queried
+# and may be changed with the physical remote at any time
+DEFAULT_VOLUME_TTL = 30.0
+# Power mode reported by the Roku when the screen is on
+POWER_ON_MODE = 'PowerOn'
+# Active app reported by the Roku on the home screen (it has no app ID)
+HOME_APP = 'home'
+
+
+class CachedValue:
+    """
+    A single cached value, along with when it was last set
+    """
+    def __init__(self):
+        self.value = None
+        self.updated_at = None
+
+    def set(self, value):
+        self.value = value
+        self.updated_at = time.monotonic()
+
+    def is_fresh(self, ttl) -> bool:
+        return self.updated_at is not None and time.monotonic() - self.updated_at < ttl
+
+
+class RokuState:
+    """
+    Lazily queried state of a Roku. Values are refreshed from ECP once they are
+    older than the TTL, and updated optimistically by actions after they send
+    a command. A value of None means the state is unknown.
+    """
+    def __init__(self, ecp: ECPClient, ttl=DEFAULT_STATE_TTL,
+                 volume_ttl=DEFAULT_VOLUME_TTL):
+        """
+        :param ecp: Client to query the Roku with
+        :param ttl: Seconds a value is trusted for
+        :param volume_ttl: Seconds the last volume set is trusted for
+        """
+        self.ecp = ecp
+        self.ttl = ttl
+        self.volume_ttl = volume_ttl
+
+        self._power_mode = CachedValue()
+        self._active_app = CachedValue()
+        # NOTE: Rokus can't report their volume, so this is only ever known
+        #       from the commands we have sent
+        self._volume = CachedValue()
+        self._lock = threading.Lock()
+
+    def power_mode(self) -> Optional[str]:
+        """
+        Returns the power mode of the Roku (ex: PowerOn, DisplayOff)
+        """
+        return self._get(
+            self._power_mode,
+            '/query/device-info',
+            lambda info: info.findtext('power-mode')
+        )
+
+    def is_on(self) -> Optional[bool]:
+        power_mode = self.power_mode()
+        if power_mode is None:
+            return None
+
+        return power_mode == POWER_ON_MODE
+
+    def active_app(self) -> Optional[str]:
+        """
+        Returns the ID of the app running on the Roku (ex: 12 for Netflix,
+        tvinput.hdmi1 for HDMI 1), or HOME_APP on the home screen
+        """
+        def parse(info):
+            app = info.find('app')
+            return HOME_APP if app is None else app.get('id', HOME_APP)
+
+        return self._get(self._active_app, '/query/active-app', parse)
+
+    def volume(self) -> Optional[int]:
+        """
+        Returns the last volume level set through the hub, if it was set
+        within volume_ttl (else None, since it may have been changed with
+        the remote)
+        """
+        with self._lock:
+            if not self._volume.is_fresh(self.volume_ttl):
+                return None
+
+            return self._volume.value
+
+    def update(self, power_mode=None, active_app=None, volume=None):
+        """
+        Optimistically updates the state after sending a command (any values
+        left as None are unchanged)
+        """
+        with self._lock:
+            if power_mode is not None:
+                self._power_mode.set(power_mode)
+            if active_app is not None:
+                self._active_app.set(str(active_app))
+            if volume is not None:
+                self._volume.set(volume)
+
+    def invalidate(self):
+        """
+        Forgets all cached state, so it is queried again on next use
+        """
+        with self._lock:
+            self._power_mode = CachedValue()
+            self._active_app = CachedValue()
+            self._volume = CachedValue()
+
+    def _get(self, cached: CachedValue, endpoint, parse: Callable[[ET.Element], str]):
+        """
+        Helper method to return the cached value, querying the Roku first if
+        it is stale. The query is made without holding the lock, so a slow
+        Roku doesn't hold up readers of the other values.
+        """
+        with self._lock:
+            if cached.is_fresh(self.ttl):
+                return cached.value
+
+            updated_at = cached.updated_at
+
+        info = self._query(endpoint)
+
+        with self._lock:
+            # Unless an action updated it while we were querying (which is
+            # more recent than what we queried)
+            if info is not None and cached.updated_at == updated_at:
+                cached.set(parse(info))
+
+            return cached.value
+
+    def _query(self, endpoint) -> Optional[ET.Element]:
+        """
+        Helper method to query the Roku, returning None if it can't be reached
+        """
+        try:
+            resp = self.ecp.query(endpoint)
+            resp.raise_for_status()
+            return ET.fromstring(resp.content)
+        except (requests.RequestException, ET.ParseError, KeyError):
+            # KeyError if the Roku's IP has never been set
+            return None
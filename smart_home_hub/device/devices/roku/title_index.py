@@ -0,0 +1,283 @@
+"""
+This file contains a local index of the titles on the Reelgood account's
+watchlists, synced in the background, so that playing a movie on a watchlist
+doesn't need any Reelgood requests (and a show only needs its next episode).
+"""
+import re
+import sqlite3
+import threading
+import time
+import requests
+
+from typing import Dict, List, NamedTuple, Optional
+
+from smart_home_hub.utils.env_consts import CONFIG_BASE_DIR
+from smart_home_hub.utils.utils import create_dirs_for
+
+TITLE_DB_PATH = 'roku/reelgood_titles.db'
+
+# Seconds between syncs of the watchlists
+DEFAULT_SYNC_INTERVAL = 6 * 60 * 60
+# Max seconds to wait for the sync thread to stop (it stops between lookups,
+# so at most one Reelgood request has to finish first)
+SYNC_STOP_TIMEOUT = 25
+# Min score (0 to 1) for a title to match what was said
+DEFAULT_MIN_SCORE = 0.7
+
+# Errors of a Reelgood lookup (including malformed responses) during a sync
+SYNC_ERRORS = (requests.RequestException, KeyError, TypeError, ValueError)
+
+# Words ignored when matching titles
+STOP_WORDS = {'a', 'an', 'and', 'of', 'the'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS titles (
+    rg_id TEXT PRIMARY KEY,
+    content_type TEXT NOT NULL,
+    title TEXT NOT NULL,
+    num_tokens INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS title_tokens (
+    token TEXT NOT NULL,
+    rg_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS title_tokens_token ON title_tokens (token);
+
+CREATE TABLE IF NOT EXISTS streaming_ids (
+    rg_id TEXT NOT NULL,
+    service TEXT NOT NULL,
+    streaming_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS streaming_ids_rg_id ON streaming_ids (rg_id);
+"""
+
+
+def title_tokens(title) -> List[str]:
+    """
+    Returns the tokens of a title (or transcript) used for matching, with
+    plurals and possessives stripped since transcripts rarely get them right,
+    ex: "The Queen's Gambit" and "queens gambit" -> ["queen", "gambit"]
+    """
+    words = re.sub(r"'s\b", '', title.casefold())
+    words = re.sub(r'[^\w]+', ' ', words).split()
+
+    return list(dict.fromkeys(
+        word[:-1] if len(word) > 3 and word.endswith('s') and not word.endswith('ss') else word
+        for word in words if word not in STOP_WORDS
+    ))
+
+
+class TitleMatch(NamedTuple):
+    """
+    A title found in the index, with its streaming ID for each service (only
+    for movies, since a show's next episode changes after every watch)
+    """
+    rg_id: str
+    title: str
+    score: float
+    streaming_ids: Dict[str, str]
+
+
+class TitleIndex:
+    """
+    A SQLite index of the watchlisted titles, with an inverted index of their
+    tokens for fuzzy matching of (possibly misheard) titles
+    """
+    def __init__(self, path=TITLE_DB_PATH, sync_interval=DEFAULT_SYNC_INTERVAL,
+                 min_score=DEFAULT_MIN_SCORE):
+        """
+        :param path: Filepath to the database, relative to CONFIG_BASE_DIR
+        :param sync_interval: Seconds between background syncs
+        :param min_score: Min score for a title to match
+        """
+        self.filepath = CONFIG_BASE_DIR + path
+        self.sync_interval = sync_interval
+        self.min_score = min_score
+
+        self.synced_at = None
+
+        # Opened on first use, so importing doesn't touch the config dir
+        self._conn = None
+        self._lock = threading.Lock()
+
+        self._sync_thread = None
+        # Client used by the sync thread (the most recently started one)
+        self._sync_client = None
+        self._sync_users = 0
+        self._sync_lock = threading.Lock()
+
+    def match(self, content_type, transcript) -> Optional[TitleMatch]:
+        """
+        Returns the title best matching the transcript, scored by the share
+        of tokens they have in common (so word order and filler words like
+        "the" don't matter), or None if nothing scores above min_score
+        :param content_type: Either show or movie ("s" | "m")
+        :param transcript: What was said (ex: "queens gambit")
+        """
+        tokens = title_tokens(transcript)
+        if not tokens:
+            return None
+
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                'SELECT t.rg_id, t.title, t.num_tokens, count(*) AS num_matches '
+                'FROM title_tokens tt JOIN titles t ON t.rg_id = tt.rg_id '
+                f'WHERE t.content_type = ? AND tt.token IN ({",".join("?" * len(tokens))}) '
+                'GROUP BY t.rg_id',
+                (content_type, *tokens)
+            ).fetchall()
+
+            best = None
+            for rg_id, title, num_tokens, num_matches in rows:
+                # Dice coefficient of the two token sets
+                score = 2 * num_matches / (len(tokens) + num_tokens)
+                if best is None or score > best[2]:
+                    best = (rg_id, title, score)
+
+            if best is None or best[2] < self.min_score:
+                return None
+
+            streaming_ids = dict(conn.execute(
+                'SELECT service, streaming_id FROM streaming_ids WHERE rg_id = ?',
+                (best[0],)
+            ).fetchall())
+
+        return TitleMatch(*best, streaming_ids)
+
+    def sync(self, rg_client, stop_event: threading.Event = None) -> int:
+        """
+        Replaces the index with the titles currently on the watchlists, along
+        with the streaming ID's of the movies. Shows are indexed by title
+        only, since the episode to play has to be looked up when it is played.
+        :param rg_client: The RGClient to sync with
+        :param stop_event: Event to give up on the sync (leaving the index as
+                           it was) once set
+        :return: The number of titles synced
+        """
+        title_rows = []
+        token_rows = []
+        streaming_rows = []
+        seen_ids = set()
+
+        for content_type in ['m', 's']:
+            for content in rg_client.iter_user_listing(content_type):
+                if stop_event is not None and stop_event.is_set():
+                    return 0
+
+                if content['id'] in seen_ids:
+                    continue
+                seen_ids.add(content['id'])
+
+                title = content.get('title')
+                tokens = title_tokens(title) if isinstance(title, str) else []
+                if not tokens:
+                    continue
+
+                streaming_ids = {}
+                if content_type == 'm':
+                    try:
+                        streaming_ids = rg_client.get_movie_viewing_id(content['id'])
+                    except SYNC_ERRORS:
+                        # Not available to stream, so not worth indexing
+                        continue
+
+                    if not streaming_ids:
+                        continue
+
+                title_rows.append((content['id'], content_type, title, len(tokens)))
+                token_rows.extend((token, content['id']) for token in tokens)
+                streaming_rows.extend(
+                    (content['id'], service, str(streaming_id))
+                    for service, streaming_id in streaming_ids.items()
+                )
+
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute('DELETE FROM titles')
+                conn.execute('DELETE FROM title_tokens')
+                conn.execute('DELETE FROM streaming_ids')
+                conn.executemany('INSERT INTO titles VALUES (?, ?, ?, ?)', title_rows)
+                conn.executemany('INSERT INTO title_tokens VALUES (?, ?)', token_rows)
+                conn.executemany('INSERT INTO streaming_ids VALUES (?, ?, ?)', streaming_rows)
+
+            self.synced_at = time.time()
+
+        return len(title_rows)
+
+    def start_background_sync(self, rg_client):
+        """
+        Starts a daemon thread syncing the index every sync_interval (does
+        nothing if one is already running, other than switching it to this
+        client). Each call must be matched by a call to stop_background_sync().
+        """
+        with self._sync_lock:
+            self._sync_users += 1
+            self._sync_client = rg_client
+            if self._sync_thread is not None:
+                return
+
+            # A new event for each thread, so a thread still stopping can't
+            # miss its stop when the next one starts
+            stop_event = threading.Event()
+            self._sync_thread = threading.Thread(
+                target=self._sync_loop,
+                args=(stop_event,),
+                name='shh-reelgood-titles',
+                daemon=True
+            )
+            self._sync_thread.stop_event = stop_event
+            self._sync_thread.start()
+
+    def stop_background_sync(self):
+        """
+        Stops the background sync (waiting for the thread to finish), once
+        every user that started it has stopped it
+        """
+        with self._sync_lock:
+            self._sync_users = max(self._sync_users - 1, 0)
+            if self._sync_users > 0:
+                return
+
+            thread = self._sync_thread
+            self._sync_thread = None
+            self._sync_client = None
+
+        if thread is not None:
+            thread.stop_event.set()
+            thread.join(timeout=SYNC_STOP_TIMEOUT)
+
+    def _sync_loop(self, stop_event: threading.Event):
+        while not stop_event.is_set():
+            with self._sync_lock:
+                rg_client = self._sync_client
+
+            if rg_client is not None:
+                try:
+                    self.sync(rg_client, stop_event)
+                except SYNC_ERRORS:
+                    # Reelgood unavailable (or sent something unexpected), we
+                    # will try again next interval
+                    pass
+
+            if stop_event.wait(self.sync_interval):
+                return
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Helper method to open the database (must hold self._lock)
+        """
+        if self._conn is None:
+            create_dirs_for(self.filepath)
+
+            self._conn = sqlite3.connect(self.filepath, check_same_thread=False)
+            with self._conn:
+                self._conn.executescript(SCHEMA)
+
+        return self._conn
+
+
+# Shared by every Roku device in the process
+rg_title_index = TitleIndex()
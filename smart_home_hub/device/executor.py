@@ -0,0 +1,193 @@
+"""
+This file contains the ActionExecutor, which all device actions are submitted
+to. Actions for the same device are run strictly in order, while actions for
+different devices run concurrently on a shared thread pool.
+"""
+import threading
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from queue import Empty, Full, Queue
+from typing import Dict, Optional
+
+from .base_device import DeviceAction
+
+# Max actions run for one device before its worker yields the pool thread
+DRAIN_BATCH_SIZE = 8
+
+
+class ExecutorFullError(Exception):
+    """
+    Raised when a device's queue is full, and the action could not be queued
+    in time
+    """
+
+
+def perform_action(action: DeviceAction) -> dict:
+    """
+    Performs the (initialized) action, and returns its response
+    """
+    action.perform()
+    return action.response()
+
+
+class DeviceQueue:
+    """
+    The bounded queue of pending actions for a single device, along with its
+    metrics
+    """
+    def __init__(self, key, max_size):
+        self.key = key
+        self.queue = Queue(maxsize=max_size)
+        self.lock = threading.Lock()
+        # Whether a worker is currently scheduled to drain this queue
+        self.scheduled = False
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.max_depth = 0
+
+    def metrics(self) -> dict:
+        return {
+            'depth': self.queue.qsize(),
+            'max_depth': self.max_depth,
+            'capacity': self.queue.maxsize,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'active': self.scheduled
+        }
+
+
+class ActionExecutor:
+    """
+    Runs device actions, using a dedicated queue per device and a thread pool
+    shared across all devices
+    """
+    def __init__(self, max_workers=4, max_queue_size=32):
+        """
+        :param max_workers: Max number of devices running actions at once
+        :param max_queue_size: Max number of pending actions per device
+        """
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+
+        self._pool = None
+        self._queues = {}
+        self._lock = threading.Lock()
+
+    def submit(self, action: DeviceAction, block=True,
+               timeout: Optional[float] = None) -> Future:
+        """
+        Queues the (initialized) action to be performed after any other
+        actions already queued for its device
+        :param block: Whether to wait for room in the queue if it is full
+        :param timeout: Max seconds to wait for room in the queue
+        :return: A Future resolving to the action's response
+        :raises: ExecutorFullError if the action could not be queued
+        """
+        device_queue = self._device_queue(action.device.executor_key())
+        future = Future()
+
+        try:
+            device_queue.queue.put((action, future), block=block, timeout=timeout)
+        except Full:
+            with device_queue.lock:
+                device_queue.rejected += 1
+            raise ExecutorFullError(
+                f'Too many pending actions for {device_queue.key}'
+            )
+
+        with device_queue.lock:
+            device_queue.submitted += 1
+            device_queue.max_depth = max(
+                device_queue.max_depth,
+                device_queue.queue.qsize()
+            )
+
+            if not device_queue.scheduled:
+                device_queue.scheduled = True
+                self._get_pool().submit(self._drain, device_queue)
+
+        return future
+
+    def perform(self, action: DeviceAction, timeout: Optional[float] = None) -> dict:
+        """
+        Helper method to submit the action, and wait for its response
+        :raises: Any exception raised while performing the action
+        """
+        return self.submit(action, timeout=timeout).result()
+
+    def metrics(self) -> Dict[str, dict]:
+        """
+        Returns the queue metrics for every device that has had an action
+        submitted
+        """
+        with self._lock:
+            device_queues = list(self._queues.values())
+
+        return {
+            device_queue.key: device_queue.metrics()
+            for device_queue in device_queues
+        }
+
+    def shutdown(self, wait=True):
+        """
+        Stops the thread pool (a new one is created if more actions are
+        submitted)
+        """
+        with self._lock:
+            pool = self._pool
+            self._pool = None
+
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='shh-action'
+                )
+
+            return self._pool
+
+    def _device_queue(self, key) -> DeviceQueue:
+        with self._lock:
+            if key not in self._queues:
+                self._queues[key] = DeviceQueue(key, self.max_queue_size)
+
+            return self._queues[key]
+
+    def _drain(self, device_queue: DeviceQueue):
+        """
+        Runs the queued actions for a device in order. Yields the pool thread
+        after DRAIN_BATCH_SIZE actions so one busy device cannot starve others.
+        """
+        for _ in range(DRAIN_BATCH_SIZE):
+            with device_queue.lock:
+                try:
+                    action, future = device_queue.queue.get_nowait()
+                except Empty:
+                    device_queue.scheduled = False
+                    return
+
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                future.set_result(perform_action(action))
+            except Exception as e:
+                future.set_exception(e)
+
+                with device_queue.lock:
+                    device_queue.failed += 1
+            else:
+                with device_queue.lock:
+                    device_queue.completed += 1
+
+        # Still more to run, so rescheduling behind any other devices
+        self._get_pool().submit(self._drain, device_queue)
@@ -0,0 +1,111 @@
+"""
+This file contains the DeviceRegistry, which holds a single long-lived instance
+of each device for the lifetime of the process.
+"""
+import threading
+
+from typing import Dict, List, Optional, Type
+
+from .base_device import Device
+from smart_home_hub.utils.config import Config
+
+
+class DeviceRegistry:
+    """
+    Process-wide registry of devices. Each device is constructed once (either
+    lazily on first use, or all at once through start()) and shared between
+    the API and VUI threads.
+
+    Callers should not hold on to the shared instances directly - instead use
+    view() to get a request-scoped copy bound to their own context.
+    """
+    def __init__(self, device_classes: Dict[str, Type[Device]]):
+        """
+        :param device_classes: Map of device names to the Device classes to
+                               build for each
+        """
+        self.device_classes = device_classes
+        self.started = False
+
+        # Incremented whenever devices are (re)built or refreshed, so anything
+        # derived from them (e.g. the API catalog) knows when to rebuild
+        self.version = 0
+
+        self._devices = {}
+        self._lock = threading.RLock()
+
+    def names(self) -> List[str]:
+        """
+        Returns the names of all devices in the registry
+        """
+        return list(self.device_classes.keys())
+
+    def get(self, device_name) -> Device:
+        """
+        Returns the shared device instance for the given name, building (and
+        starting) it if this is the first time it has been requested
+        :raises: KeyError if no device exists with this name
+        """
+        device = self._devices.get(device_name)
+        if device is not None:
+            return device
+
+        with self._lock:
+            # Checking again in case another thread built it while we waited
+            if device_name not in self._devices:
+                device = self.device_classes[device_name]()
+                device.start()
+                self._devices[device_name] = device
+
+            return self._devices[device_name]
+
+    def view(self, device_name, context: Optional[Config] = None) -> Device:
+        """
+        Returns a request-scoped view of the shared device, bound to the given
+        context. The view shares all expensive state (configs, clients, etc.)
+        with the shared instance.
+        :raises: KeyError if no device exists with this name
+        """
+        return self.get(device_name).with_context(context)
+
+    def start(self):
+        """
+        Builds and starts every registered device
+        """
+        with self._lock:
+            for device_name in self.device_classes:
+                self.get(device_name)
+
+            self.started = True
+            self.version += 1
+
+    def refresh(self, device_name=None):
+        """
+        Refreshes the given device (or all built devices if no name is given),
+        e.g. to pick up config changes made outside of the hub
+        """
+        with self._lock:
+            if device_name is None:
+                devices = list(self._devices.values())
+            else:
+                devices = [self.get(device_name)]
+
+        for device in devices:
+            device.refresh()
+
+        with self._lock:
+            self.version += 1
+
+    def shutdown(self):
+        """
+        Shuts down every built device, and clears the registry so any later
+        request builds fresh instances
+        """
+        with self._lock:
+            devices = list(self._devices.values())
+            self._devices = {}
+            self.started = False
+            self.version += 1
+
+        for device in devices:
+            device.shutdown()
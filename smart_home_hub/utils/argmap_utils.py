@@ -16,3 +16,28 @@ STR_TO_FIELD_MAP = {
     v: k
     for k, v in FIELD_TO_STR_MAP.items()
 }
+
+
+def argmap_fingerprint(argmap) -> tuple:
+    """
+    Returns a hashable fingerprint of an argmap, which changes whenever the
+    fields (or their settings) in the argmap change
+    :param argmap: Dict containing string keys to marshmallow field values
+    """
+    fingerprint = []
+
+    for key, val in sorted(argmap.items()):
+        if isinstance(val, fields.Field):
+            fingerprint.append((
+                key,
+                type(val).__name__,
+                val.required,
+                repr(val.missing),
+                repr(sorted(val.metadata.items()))
+            ))
+        elif type(val) is dict:
+            fingerprint.append((key, argmap_fingerprint(val)))
+        else:
+            fingerprint.append((key, repr(val)))
+
+    return tuple(fingerprint)
@@ -1,14 +1,172 @@
 import json
 import os
+import threading
+import time
 
 from abc import ABCMeta, abstractmethod
 from collections import MutableMapping
 from copy import deepcopy
-from typing import Union
+from typing import Any, Dict, NamedTuple, Optional, Tuple, Union
 
 from .env_consts import CONFIG_BASE_DIR
 from .utils import create_dirs_for
 
+# Min seconds between checks of whether a config file has changed on disk
+DEFAULT_CHECK_INTERVAL = 1.0
+
+
+class StoreEntry(NamedTuple):
+    # None if the file doesn't exist
+    content: Any
+    # (mtime_ns, size, inode) of the file when it was read
+    file_stat: Optional[tuple]
+    version: int
+    checked_at: float
+
+
+class ConfigStore:
+    """
+    A process-wide, in-memory store of parsed config files, so a config is
+    only read & parsed again once its file changes (by its mtime, size or
+    inode, checked at most every check_interval seconds).
+
+    Every load or save of a file gives it a new version, which callers can
+    compare against to tell if the content they built something from is
+    still current.
+
+    NOTE: The content returned is shared by every reader, so it must never be
+          modified in place (Config copies it before its first modification)
+    """
+    def __init__(self, check_interval=DEFAULT_CHECK_INTERVAL):
+        """
+        :param check_interval: Min seconds between checks of each file
+        """
+        self.check_interval = check_interval
+
+        self.hits = 0
+        self.loads = 0
+
+        self._entries: Dict[str, StoreEntry] = {}
+        self._next_version = 1
+        self._lock = threading.Lock()
+
+    def get(self, filepath) -> Tuple[Any, int]:
+        """
+        Returns the parsed content of the file, and its version
+        :param filepath: Full filepath to the config
+        :raises: FileNotFoundError if the file doesn't exist
+        """
+        entry = self._entry(filepath)
+        if entry.content is None:
+            raise FileNotFoundError(filepath)
+
+        return entry.content, entry.version
+
+    def version(self, filepath) -> int:
+        """
+        Returns the current version of the file (which changes whenever the
+        file is loaded again, saved, or deleted)
+        """
+        return self._entry(filepath).version
+
+    def put(self, filepath, content):
+        """
+        Records content just written to the file, so it is served without
+        reading the file again
+        """
+        file_stat = self._stat(filepath)
+
+        with self._lock:
+            self._entries[filepath] = StoreEntry(
+                content, file_stat, self._take_version(), time.monotonic()
+            )
+
+    def discard(self, filepath=None):
+        """
+        Drops the file (or every file), so it is read again on next use
+        """
+        with self._lock:
+            if filepath is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(filepath, None)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'loads': self.loads,
+                'files': len(self._entries)
+            }
+
+    def _entry(self, filepath) -> StoreEntry:
+        """
+        Helper method to return the entry for the file, reading the file
+        again if it has changed since it was last read. The file is read
+        without holding the lock (so one slow read doesn't hold up every
+        other config), and the entry is only replaced if no other thread
+        replaced it in the meantime.
+        """
+        with self._lock:
+            entry = self._entries.get(filepath)
+            if entry is not None and time.monotonic() - entry.checked_at < self.check_interval:
+                self.hits += 1
+                return entry
+
+        file_stat = self._stat(filepath)
+        content = None
+
+        is_unchanged = entry is not None and file_stat == entry.file_stat
+        if not is_unchanged and file_stat is not None:
+            try:
+                with open(filepath) as config_file:
+                    content = json.load(config_file)
+            except FileNotFoundError:
+                # Deleted since the stat
+                file_stat = None
+                is_unchanged = entry is not None and entry.file_stat is None
+
+        with self._lock:
+            current = self._entries.get(filepath)
+            if current is not None and current is not entry:
+                # Another thread read (or saved) the file in the meantime. If
+                # it was discarded instead, what was just read is stored.
+                return current
+
+            if is_unchanged:
+                # Including a file that is still missing, so its version only
+                # changes once it exists
+                self.hits += 1
+                new_entry = entry._replace(checked_at=time.monotonic())
+            else:
+                if file_stat is not None:
+                    self.loads += 1
+                new_entry = StoreEntry(
+                    content, file_stat, self._take_version(), time.monotonic()
+                )
+
+            self._entries[filepath] = new_entry
+
+            return new_entry
+
+    def _take_version(self) -> int:
+        """
+        Helper method to return a new version (must hold self._lock)
+        """
+        version = self._next_version
+        self._next_version += 1
+
+        return version
+
+    @staticmethod
+    def _stat(filepath) -> Optional[tuple]:
+        try:
+            file_stat = os.stat(filepath)
+        except FileNotFoundError:
+            return None
+
+        return file_stat.st_mtime_ns, file_stat.st_size, file_stat.st_ino
+
 
 class ConfigMap:
     """
@@ -39,6 +197,12 @@ class Config(MutableMapping, metaclass=ABCMeta):
     """
     def __init__(self):
         self.content = None
+        # Version (in config_store) of the file content was loaded from, or
+        # None if content didn't come from the file
+        self.version = None
+        # Whether content is still shared with config_store (and so must be
+        # copied before it is modified)
+        self._shared = False
 
         try:
             self.load()
@@ -51,26 +215,39 @@ class Config(MutableMapping, metaclass=ABCMeta):
     def save(self):
         """
         Saves the config file in self.filepath (overwriting current file)
+
+        NOTE: Writes to a temporary file first, so readers never see a
+              partially written config
         """
         create_dirs_for(self.filepath)
+        tmp_filepath = f'{self.filepath}.{os.getpid()}.{threading.get_ident()}.tmp'
 
-        with open(self.filepath, 'w') as config_file:
+        with open(tmp_filepath, 'w') as config_file:
             json.dump(self.content, config_file, indent=2)
 
+        os.replace(tmp_filepath, self.filepath)
+
+        # Shared from now on, so other configs for the file don't read it again
+        config_store.put(self.filepath, self.content)
+        self.version = config_store.version(self.filepath)
+        self._shared = True
+
         self.file_exists = True
 
     def load(self):
         """
-        Loads the config from self.filepath into self.content
+        Loads the config from self.filepath into self.content (served from
+        config_store, unless the file has changed)
         """
-        with open(self.filepath) as config_file:
-            self.content = json.load(config_file)
+        self.content, self.version = config_store.get(self.filepath)
+        self._shared = True
 
     def delete(self):
         """
         Deletes the config file in self.filepath (but not self.content)
         """
         os.remove(self.filepath)
+        config_store.discard(self.filepath)
 
         self.file_exists = False
 
@@ -92,16 +269,12 @@ class Config(MutableMapping, metaclass=ABCMeta):
         Helper method to check if self.content differs from the config stored
         in self.filepath
         """
-        old_content = self.content
         try:
-            self.load()
+            file_content, _ = config_store.get(self.filepath)
         except FileNotFoundError:
             return True
 
-        has_changes = old_content != self.content
-        self.content = old_content
-
-        return has_changes
+        return file_content != self.content
 
     def init_default_content(self):
         """
@@ -113,12 +286,14 @@ class Config(MutableMapping, metaclass=ABCMeta):
             config_map = ConfigMap(config_map)
 
         self.content = deepcopy(config_map.default_mapping)
+        self._shared = False
 
     def reset_content(self):
         """
         Method to reset the content to a blank dict.
         """
         self.content = {}
+        self._shared = False
 
     @property
     def filepath(self):
@@ -138,12 +313,25 @@ class Config(MutableMapping, metaclass=ABCMeta):
         Method to implement. Should return a ConfigMap object
         """
 
+    def _own_content(self):
+        """
+        Helper method to copy self.content before it is modified, if it is
+        still shared with config_store
+        """
+        if self._shared:
+            self.content = deepcopy(self.content)
+            self._shared = False
+
     # Defining dict access methods
+    # NOTE: Nested values are shared with config_store, so should be replaced
+    #       (config[key] = new_value) rather than modified in place
 
     def __setitem__(self, k, v):
+        self._own_content()
         self.content[k] = v
 
     def __delitem__(self, v):
+        self._own_content()
         self.content.__delitem__(v)
 
     def __getitem__(self, k):
@@ -156,9 +344,14 @@ class Config(MutableMapping, metaclass=ABCMeta):
         return self.content.__iter__()
 
 
+# Shared by every config in the process
+config_store = ConfigStore()
+
+
 def load_config(path):
     """
-    Returns a config loaded from the path specified. Ideally, this config
+    Returns a config loaded from the path specified (served from
+    config_store, so cheap to call repeatedly). Ideally, this config
     is read-only. However, there will be no restrictions placed, so the
     user can modify and save the config if it wishes
     :param path: Filepath to the config. Relative to CONFIG_BASE_DIR
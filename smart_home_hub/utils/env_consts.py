@@ -11,7 +11,37 @@ CONFIG_BASE_DIR = os.environ.get('SHH_CONFIG_BASE_DIR')
 if CONFIG_BASE_DIR is None:
     CONFIG_BASE_DIR = 'config/'
 
+# Whether Roku commands that would not change anything (ex: powerOn when
+# already on) should be skipped
+ROKU_SKIP_REDUNDANT = os.environ.get(
+    'SHH_ROKU_SKIP_REDUNDANT', ''
+).lower() in ['1', 'true', 'yes']
+
+# Backend for the Roku content maps, either "json" (loaded into memory) or
+# "sqlite" (for large catalogs, see bin/import_content_store.py)
+ROKU_CONTENT_STORES = ['json', 'sqlite']
+ROKU_CONTENT_STORE = os.environ.get('SHH_ROKU_CONTENT_STORE', 'json').lower()
+
 try:
     MIC_DEVICE_NDX = int(os.environ.get('SHH_MIC_DEVICE_INDEX'))
 except (TypeError, ValueError):
     MIC_DEVICE_NDX = None
+
+
+def check_env():
+    """
+    Checks the environment defined constants that can't fall back to a
+    default, so an invalid value is reported at startup (instead of when
+    first used)
+    :raises: ValueError describing each invalid variable
+    """
+    errors = []
+
+    if ROKU_CONTENT_STORE not in ROKU_CONTENT_STORES:
+        errors.append(
+            f'SHH_ROKU_CONTENT_STORE must be one of {", ".join(ROKU_CONTENT_STORES)} '
+            f'(got "{ROKU_CONTENT_STORE}")'
+        )
+
+    if errors:
+        raise ValueError('Invalid environment variables: ' + '; '.join(errors))
@@ -1,4 +1,8 @@
 import os
+import threading
+
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
 
 
 def create_dirs_for(filepath):
@@ -47,3 +51,56 @@ class DescClass:
     @property
     def description(self):
         return self._desc
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls: while a call for a key is in flight, any
+    other calls for the same key wait for it and share its result (or error)
+    instead of making their own
+    """
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Returns fn(), or the result of the call already in flight for the key
+        :param key: Key identifying identical calls
+        :param fn: Function making the call
+        :raises: Whatever fn raised (in every thread sharing the call)
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_leader = future is None
+
+            if is_leader:
+                future = Future()
+                self._in_flight[key] = future
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+        return future.result()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'shared': self.shared,
+                'in_flight': len(self._in_flight)
+            }
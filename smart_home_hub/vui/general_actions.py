@@ -3,7 +3,6 @@ This file contains all general DeviceActions that can be run without a
 device, and at any time.
 """
 from marshmallow import fields
-from typing import List
 
 from smart_home_hub.device.base_device import DeviceAction
 from smart_home_hub.device.context_device import ContextDevice
@@ -66,11 +65,10 @@ class GenericDevice(ContextDevice):
     """
     _name = 'generic_vui_device'
 
-    def actions(self) -> List[DeviceAction]:
-        # NOTE: We intentionally do not combine with super() here. Instead, we
-        #       override the 'list' action
-        return [
-            ListDevices(self),
-            EnterDevice(self),
-            ExitDevice(self)
-        ]
+    # NOTE: We intentionally do not extend the base _action_classes here.
+    #       Instead, we override the 'list' action
+    _action_classes = [
+        ListDevices,
+        EnterDevice,
+        ExitDevice
+    ]
@@ -10,9 +10,15 @@ load_dotenv(find_dotenv(raise_error_if_not_found=True, usecwd=True))
 from smart_home_hub.vui.vui_thread import VUI
 from smart_home_hub.vui.tts.basic_tts import BasicTTS
 from smart_home_hub.vui.stt.pico_stt import PicoSTT
+from smart_home_hub.utils.env_consts import check_env
 
 
 def main():
+    try:
+        check_env()
+    except ValueError as e:
+        sys.exit(str(e))
+
     vui = VUI(
         BasicTTS(debug=True),
         PicoSTT(debug=True)
@@ -9,7 +9,7 @@ handle on how to properly set this kind of project up.
 """
 from marshmallow import fields
 
-from smart_home_hub.device import device_class_map
+from smart_home_hub.device import action_executor, device_registry
 from smart_home_hub.device.base_device import Device, DeviceAction
 from smart_home_hub.utils.config import Config
 from .general_actions import GenericDevice
@@ -52,6 +52,9 @@ class VUI:
 
         self.prompt = None
 
+        # Long-lived instance, so we don't rebuild it for every command
+        self.generic_device = GenericDevice()
+
     def device_from(self, input_: CommandParser, context) -> Device:
         """
         Returns the Device to use based on the input string and current context
@@ -59,23 +62,21 @@ class VUI:
         :param context: A dict of JSON context surrounding the command
         :return: The Device object we are retrieving
         """
-        general_actions = GenericDevice().action_names()
+        general_actions = self.generic_device.action_names()
         if input_.prefix_from(general_actions, pop_if_true=False):
             # Cutting off logic if the first element of the input string is
             # a general action
-            return GenericDevice(context=context)
+            return self.generic_device.with_context(context)
 
         if context is not None and context.get('device'):
             device_name = context['device']
         else:
-            device_name = input_.prefix_from(device_class_map.keys())
+            device_name = input_.prefix_from(device_registry.names())
 
         try:
             # TODO: Create a PromptDevice base class that can prompt for input
             #       using TTS and STT
-            return device_class_map[device_name](
-                context=context
-            )
+            return device_registry.view(device_name, context=context)
         except KeyError:
             raise NextCommandException(f"No device named {input_.pop()}")
 
@@ -94,7 +95,7 @@ class VUI:
                 raise NextCommandException(f"Must specify an action")
 
         try:
-            return device.action_map()[action_name]
+            return device.action(action_name)
         except KeyError:
             raise NextCommandException(
                 f"No action named {input_.pop()} for device {device.name}"
@@ -109,20 +110,22 @@ class VUI:
         # TODO: Can maybe even use the tts and stt here
         args = {}
 
+        argmap = action.device.action_spec(action.name).argmap
+
         # TODO: Maybe hit these all at once on one loop?
         ordered_args = sorted(
             [
-                (arg_name, arg) for arg_name, arg in action.argmap().items()
+                (arg_name, arg) for arg_name, arg in argmap.items()
                 if 'voice_ndx' in arg.metadata
             ],
             key=lambda x: x[1].metadata['voice_ndx']
         )
         required_args = [
-            (arg_name, arg) for arg_name, arg in action.argmap().items()
+            (arg_name, arg) for arg_name, arg in argmap.items()
             if arg.required
         ]
         default_args = [
-            (arg_name, arg) for arg_name, arg in action.argmap().items()
+            (arg_name, arg) for arg_name, arg in argmap.items()
             if arg.missing != fields.missing_
         ]
 
@@ -181,8 +184,7 @@ class VUI:
                 action = self.action_from(input_, context, device)
                 self.init_args_from(input_, context, action)
 
-                action.perform()
-                self.prompt = action.response()['message']
+                self.prompt = action_executor.perform(action)['message']
 
             except NextCommandException as e:
                 self.prompt = e.msg
@@ -0,0 +1,84 @@
+"""
+Tests for the incremental Reelgood show payload parser.
+
+Usage (from the repo root): python -m unittest discover tests
+"""
+import json
+import os, sys
+import unittest
+
+sys.path.append(os.getcwd())
+
+from smart_home_hub.device.devices.roku.reelgood_stream import JSONStream, parse_show_episode
+
+SHOW = {
+    'id': 'show',
+    'title': 'A Show — With é Non-ASCII "Quoted" \\ Title',
+    'rating': -7.5e-1,
+    'seasons': [{'number': 1, 'tags': ['a', '{', ']']}, {'number': 2}],
+    'episodes': {
+        'ep-3': {'id': 'ep-3', 'sequence_number': 30, 'availability': [{'source_name': 'hulu'}]},
+        'ep-1': {'id': 'ep-1', 'sequence_number': 10.0, 'availability': [{'source_name': 'netflix'}]},
+        'ep-2': {'id': 'ep-2', 'sequence_number': 2e1, 'availability': []}
+    },
+    'recommended_episode': {'episode_id': 'ep-2'},
+    'score': 1234567
+}
+
+
+def split_at(payload: bytes, *offsets):
+    """
+    Returns the payload as chunks, split at each of the offsets
+    """
+    bounds = [0, *offsets, len(payload)]
+    return [payload[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+class TestJSONStream(unittest.TestCase):
+    def test_values_at_every_split(self):
+        payload = json.dumps(SHOW).encode('utf-8')
+
+        for offset in range(len(payload) + 1):
+            with self.subTest(offset=offset):
+                stream = JSONStream(split_at(payload, offset))
+                self.assertEqual(stream.value(), SHOW)
+
+    def test_numbers_at_every_split(self):
+        payload = b'[7.5e-3, -12, 0, 3.25, 1E+2]'
+        expected = json.loads(payload)
+
+        for offset in range(len(payload) + 1):
+            with self.subTest(offset=offset):
+                stream = JSONStream(split_at(payload, offset))
+                self.assertEqual([stream.value() for _ in stream.elements()], expected)
+
+    def test_number_at_end_of_text(self):
+        for chunks in ([b'7.5'], [b'7.', b'5'], [b'7', b'.', b'5', b'']):
+            with self.subTest(chunks=chunks):
+                self.assertEqual(JSONStream(chunks).value(), 7.5)
+
+
+class TestParseShowEpisode(unittest.TestCase):
+    def test_recommended_at_every_split(self):
+        payload = json.dumps(SHOW).encode('utf-8')
+
+        for offset in range(len(payload) + 1):
+            with self.subTest(offset=offset):
+                episode = parse_show_episode(split_at(payload, offset))
+                self.assertEqual(episode['id'], 'ep-2')
+
+    def test_lowest_sequence_number_without_recommended(self):
+        show = dict(SHOW, recommended_episode=None)
+        payload = json.dumps(show).encode('utf-8')
+
+        for offset in range(len(payload) + 1):
+            with self.subTest(offset=offset):
+                episode = parse_show_episode(split_at(payload, offset))
+                self.assertEqual(episode['id'], 'ep-1')
+
+    def test_no_episodes(self):
+        self.assertIsNone(parse_show_episode([b'{"id": "show", "episodes": {}}']))
+
+
+if __name__ == '__main__':
+    unittest.main()